@@ -0,0 +1,9 @@
+from django.contrib import admin
+from .models import RefreshToken
+
+
+@admin.register(RefreshToken)
+class RefreshTokenAdmin(admin.ModelAdmin):
+    list_display = ('user', 'created', 'expires_at')
+    search_fields = ('user__username',)
+    exclude = ('key_hash',)
@@ -1,16 +1,181 @@
-from rest_framework.authentication import TokenAuthentication
+import hashlib
+import secrets
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.authentication import BaseAuthentication, TokenAuthentication, get_authorization_header
+from rest_framework.authtoken.models import Token
 from rest_framework.exceptions import AuthenticationFailed
-from .models import CustomToken
+
+from .models import RefreshToken
+
+ACCESS_TOKEN_SALT = 'accounts.access-token'
+
+
+def token_cache_key(key):
+    return f'accounts:token:{key}'
+
+
+def invalidate_cached_token(key):
+    cache.delete(token_cache_key(key))
+
+
+def token_expires_at(created):
+    return created + timedelta(hours=settings.AUTH_TOKEN_IDLE_HOURS)
+
+
+def issue_token(user):
+    """The user's token, replaced by a fresh one if the current one has expired."""
+    token, created = Token.objects.get_or_create(user=user)
+    if not created and token_expires_at(token.created) <= timezone.now():
+        token.delete()
+        token = Token.objects.create(user=user)
+    return token
+
+
+def revoke_tokens(user):
+    """Log the user out everywhere, e.g. after a password change."""
+    # Deleting fires post_delete, which drops the cached lookups.
+    Token.objects.filter(user=user).delete()
+    # Access tokens already handed out lapse within AUTH_ACCESS_TOKEN_SECONDS.
+    RefreshToken.objects.filter(user=user).delete()
+
+
+def purge_expired_tokens(now=None):
+    """Delete tokens past their idle expiry, those of deactivated users and expired refresh tokens."""
+    now = now or timezone.now()
+    cutoff = now - timedelta(hours=settings.AUTH_TOKEN_IDLE_HOURS)
+    dead = Token.objects.filter(created__lte=cutoff) | Token.objects.filter(user__is_active=False)
+    purged = dead.delete()[0]
+    return purged + RefreshToken.objects.filter(expires_at__lte=now).delete()[0]
+
 
 class ExpiringTokenAuthentication(TokenAuthentication):
-    model = CustomToken
+    """
+    Token authentication with a sliding expiry: a token unused for
+    AUTH_TOKEN_IDLE_HOURS stops working. `Token.created` records the last time the
+    token was renewed; activity moves it forward at most once per
+    AUTH_TOKEN_REFRESH_SECONDS, so requests don't each write to the database.
+
+    The token lookup is kept in the cache for AUTH_TOKEN_CACHE_SECONDS as (user ID,
+    role, is_active, renewed at), never the user row itself with its password hash,
+    and dropped when the token is deleted (logout, revocation, purge) or the user is
+    saved. The request's user is built from it like token_user does.
+    """
+
+    def authenticate_credentials(self, key):
+        cache_key = token_cache_key(key)
+        entry = cache.get(cache_key)
+        if entry is None:
+            try:
+                entry = Token.objects.filter(key=key).values_list(
+                    'user_id', 'user__role', 'user__is_active', 'created',
+                ).get()
+            except Token.DoesNotExist:
+                raise AuthenticationFailed('Invalid token.')
+            cache.set(cache_key, entry, settings.AUTH_TOKEN_CACHE_SECONDS)
+        user_id, role, is_active, created = entry
+
+        if not is_active:
+            raise AuthenticationFailed('User inactive or deleted.')
+
+        now = timezone.now()
+        if token_expires_at(created) <= now:
+            Token.objects.filter(key=key).delete()
+            invalidate_cached_token(key)
+            raise AuthenticationFailed('Token has expired.')
+
+        if (now - created).total_seconds() >= settings.AUTH_TOKEN_REFRESH_SECONDS:
+            # Only renew a token that still exists, in case it was revoked meanwhile.
+            if not Token.objects.filter(key=key).update(created=now):
+                invalidate_cached_token(key)
+                raise AuthenticationFailed('Invalid token.')
+            created = now
+            cache.set(cache_key, (user_id, role, is_active, created), settings.AUTH_TOKEN_CACHE_SECONDS)
+
+        user = token_user(user_id, role, is_active=is_active)
+        return user, Token(key=key, user=user, created=created)
+
+
+def make_access_token(user):
+    """Signed, short-lived access token carrying the user's ID and role."""
+    payload = {'u': user.pk, 'r': user.role, 'e': int(time.time()) + settings.AUTH_ACCESS_TOKEN_SECONDS}
+    return signing.dumps(payload, salt=ACCESS_TOKEN_SALT)
+
+
+def _hash_refresh_key(key):
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def issue_token_pair(user):
+    """(access token, refresh token) for the stateless login mode."""
+    key = secrets.token_urlsafe(32)
+    RefreshToken.objects.create(
+        key_hash=_hash_refresh_key(key),
+        user=user,
+        expires_at=timezone.now() + timedelta(days=settings.AUTH_REFRESH_TOKEN_DAYS),
+    )
+    return make_access_token(user), key
+
+
+def rotate_refresh_token(key):
+    """
+    Exchange a refresh token for a new token pair. The old refresh token is used up,
+    so a leaked one stops working once its owner refreshes. Raises
+    AuthenticationFailed for unknown, expired or deactivated ones.
+    """
+    refresh = RefreshToken.objects.select_related('user').filter(key_hash=_hash_refresh_key(key or '')).first()
+    # Only one caller can delete the row, so a refresh token can't be spent twice.
+    if refresh is None or not RefreshToken.objects.filter(pk=refresh.pk).delete()[0]:
+        raise AuthenticationFailed('Invalid refresh token.')
+    if refresh.expires_at <= timezone.now() or not refresh.user.is_active:
+        raise AuthenticationFailed('Refresh token has expired.')
+    return issue_token_pair(refresh.user)
+
+
+def revoke_refresh_token(key, user):
+    RefreshToken.objects.filter(key_hash=_hash_refresh_key(key), user=user).delete()
+
+
+def token_user(user_id, role, **known):
+    """
+    A CustomUser with only `id`, `role` and the fields in `known` loaded. It behaves
+    like the real row for foreign keys, comparisons and ORM lookups; the first read
+    of any other field loads all of them in one query. Saving it before that only
+    writes the loaded fields.
+    """
+    user_model = get_user_model()
+    known = {'id': user_id, 'role': role, **known}
+    fields = [field.attname for field in user_model._meta.concrete_fields if field.attname in known]
+    return user_model.from_db('default', fields, [known[name] for name in fields])
+
+
+class SignedTokenAuthentication(BaseAuthentication):
+    """
+    Stateless authentication with the access tokens of make_access_token, sent as
+    `Authorization: Bearer <token>`. Verifying one is an HMAC check: no database or
+    cache lookup, and no CustomUser query unless a view reads more than the ID and role.
+    """
+    keyword = 'Bearer'
 
     def authenticate(self, request):
-        auth = super().authenticate(request)
-        if auth is None:
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
             return None
-        user, token = auth
-        if token.is_expired():
-            token.delete()  # Delete the expired token
+        if len(auth) != 2:
+            raise AuthenticationFailed('Invalid token header.')
+        try:
+            payload = signing.loads(auth[1].decode(), salt=ACCESS_TOKEN_SALT)
+        except (signing.BadSignature, UnicodeError):
+            raise AuthenticationFailed('Invalid token.')
+        if payload['e'] <= time.time():
             raise AuthenticationFailed('Token has expired.')
-        return (user, token)
\ No newline at end of file
+        return token_user(payload['u'], payload['r']), payload
+
+    def authenticate_header(self, request):
+        return self.keyword
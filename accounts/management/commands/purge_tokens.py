@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from accounts.authentication import purge_expired_tokens
+
+
+class Command(BaseCommand):
+    help = "Delete API tokens that expired from disuse or belong to deactivated users, and expired refresh tokens."
+
+    def handle(self, *args, **options):
+        purged = purge_expired_tokens()
+        self.stdout.write(self.style.SUCCESS(f"Purged {purged} expired token(s)."))
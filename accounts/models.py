@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.db import models
+
+
+class RefreshToken(models.Model):
+    """
+    Long-lived credential exchanged for signed access tokens. Only the SHA-256 of
+    the key is stored; deleting the row revokes it.
+    """
+    key_hash = models.CharField(max_length=64, unique=True)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='refresh_tokens', on_delete=models.CASCADE)
+    created = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"Refresh token of {self.user} (expires {self.expires_at})"
@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import invalidate_cached_token
+
+
+@receiver(post_delete, sender=Token)
+def forget_deleted_token(sender, instance, **kwargs):
+    invalidate_cached_token(instance.key)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def forget_user_tokens(sender, instance, **kwargs):
+    # Role, activation or password changes must not be served from a cached lookup.
+    for key in Token.objects.filter(user=instance).values_list('key', flat=True):
+        invalidate_cached_token(key)
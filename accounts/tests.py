@@ -1,3 +1,141 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from users.models import CustomUser
+from .authentication import make_access_token, purge_expired_tokens, revoke_tokens
+from .models import RefreshToken
+
+
+@override_settings(AUTH_TOKEN_IDLE_HOURS=1, AUTH_TOKEN_REFRESH_SECONDS=60)
+class ExpiringTokenTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user('student', password='pw', role='student')
+        self.client = APIClient()
+
+    def login(self):
+        response = self.client.post('/api/auth/login/', {'username': 'student', 'password': 'pw'})
+        self.assertEqual(response.status_code, 200)
+        return response.data['token']
+
+    def get(self, key):
+        return self.client.get('/api/courses/', HTTP_AUTHORIZATION=f'Token {key}')
+
+    def age(self, key, **delta):
+        Token.objects.filter(key=key).update(created=timezone.now() - timedelta(**delta))
+
+    def test_token_authenticates(self):
+        self.assertEqual(self.get(self.login()).status_code, 200)
+
+    def test_idle_token_expires_and_is_deleted(self):
+        key = self.login()
+        self.age(key, hours=2)
+        self.assertEqual(self.get(key).status_code, 401)
+        self.assertFalse(Token.objects.filter(key=key).exists())
+        # Logging in again hands out a new token.
+        self.assertNotEqual(self.login(), key)
+
+    def test_activity_renews_the_token(self):
+        key = self.login()
+        self.age(key, minutes=30)
+        self.assertEqual(self.get(key).status_code, 200)
+        # The request renewed the token; only an idle one expires.
+        self.assertGreater(Token.objects.get(key=key).created, timezone.now() - timedelta(minutes=1))
+
+    def test_logout_deletes_the_token(self):
+        key = self.login()
+        self.get(key)
+        response = self.client.post('/api/auth/logout/', HTTP_AUTHORIZATION=f'Token {key}')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Token.objects.filter(key=key).exists())
+        self.assertEqual(self.get(key).status_code, 401)
+
+    def test_revoked_token_stops_working(self):
+        key = self.login()
+        self.assertEqual(self.get(key).status_code, 200)
+        revoke_tokens(self.user)
+        self.assertEqual(self.get(key).status_code, 401)
+
+    def test_deactivated_user_is_rejected(self):
+        key = self.login()
+        self.assertEqual(self.get(key).status_code, 200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.get(key).status_code, 401)
+
+    def test_purge_expired_tokens(self):
+        key = self.login()
+        other = CustomUser.objects.create_user('other', password='pw', role='student')
+        fresh = Token.objects.create(user=other)
+        self.age(key, hours=2)
+        self.assertEqual(purge_expired_tokens(), 1)
+        self.assertEqual(list(Token.objects.values_list('key', flat=True)), [fresh.key])
+
+
+class StatelessTokenTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user('student', password='pw', role='student')
+        self.client = APIClient()
+
+    def login(self):
+        response = self.client.post(
+            '/api/auth/login/', {'username': 'student', 'password': 'pw', 'mode': 'stateless'},
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.data['access'], response.data['refresh']
+
+    def refresh(self, key):
+        return self.client.post('/api/auth/refresh/', {'refresh': key})
+
+    def get(self, access):
+        return self.client.get('/api/courses/', HTTP_AUTHORIZATION=f'Bearer {access}')
+
+    def test_access_token_authenticates(self):
+        access, _ = self.login()
+        self.assertEqual(self.get(access).status_code, 200)
+
+    def test_expired_or_forged_access_token_is_rejected(self):
+        with override_settings(AUTH_ACCESS_TOKEN_SECONDS=-1):
+            expired = make_access_token(self.user)
+        with override_settings(SECRET_KEY='not-the-secret-key'):
+            forged = make_access_token(self.user)
+        self.assertEqual(self.get(expired).status_code, 401)
+        self.assertEqual(self.get(forged).status_code, 401)
+
+    def test_refresh_token_is_single_use(self):
+        _, key = self.login()
+        response = self.refresh(key)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.data['refresh'], key)
+        self.assertEqual(self.get(response.data['access']).status_code, 200)
+        self.assertEqual(self.refresh(key).status_code, 401)
+        self.assertEqual(self.refresh(response.data['refresh']).status_code, 200)
+
+    def test_expired_refresh_token_is_rejected(self):
+        _, key = self.login()
+        RefreshToken.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(self.refresh(key).status_code, 401)
+        self.assertFalse(RefreshToken.objects.exists())
+
+    def test_deactivated_user_cannot_refresh(self):
+        _, key = self.login()
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.refresh(key).status_code, 401)
+
+    def test_logout_revokes_the_refresh_token(self):
+        access, key = self.login()
+        response = self.client.post('/api/auth/logout/', {'refresh': key}, HTTP_AUTHORIZATION=f'Bearer {access}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.refresh(key).status_code, 401)
+
+    def test_revoke_tokens_drops_refresh_tokens(self):
+        _, key = self.login()
+        revoke_tokens(self.user)
+        self.assertEqual(self.refresh(key).status_code, 401)
@@ -4,8 +4,12 @@ from rest_framework.decorators import action
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.authtoken.models import Token
+from rest_framework.authtoken.views import ObtainAuthToken
+from .authentication import issue_token, issue_token_pair, revoke_refresh_token, revoke_tokens, rotate_refresh_token
 from django.contrib.auth import authenticate
+from django.conf import settings
 from users.models import CustomUser
 from users.serializers import UserSerializer
 from .serializers import CustomUserRegistrationSerializer
@@ -24,27 +28,64 @@ class CustomUserRegistrationView(viewsets.ModelViewSet):
         user = serializer.save()  
         return Response({'username': user.username, 'role': user.role}, status=status.HTTP_201_CREATED)
 
+class ObtainExpiringAuthToken(ObtainAuthToken):
+    """Like DRF's obtain_auth_token, but an expired token is replaced rather than handed out again."""
+    authentication_classes = []
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        token = issue_token(serializer.validated_data['user'])
+        return Response({'token': token.key})
+
 class AuthViewSet(viewsets.ModelViewSet):
     queryset = CustomUser.objects.all()
     serializer_class = UserSerializer
     permission_classes = [AllowAny, IsAuthenticated]  
 
-    @action(detail=False, methods=['post'], permission_classes=[AllowAny])
+    # A client whose token expired must still be able to log in again.
+    @action(detail=False, methods=['post'], permission_classes=[AllowAny], authentication_classes=[])
     def login(self, request):
         username = request.data.get('username')
         password = request.data.get('password')
         user = authenticate(username=username, password=password)
 
         if user is not None:
-            token, created = Token.objects.get_or_create(user=user)
+            if request.data.get('mode') == 'stateless':
+                # Signed access token plus a refresh token; see SignedTokenAuthentication.
+                access, refresh = issue_token_pair(user)
+                return Response({
+                    'access': access,
+                    'refresh': refresh,
+                    'expires_in': settings.AUTH_ACCESS_TOKEN_SECONDS,
+                    'role': user.role,
+                }, status=status.HTTP_200_OK)
+            token = issue_token(user)
             return Response({'token': token.key, 'role': user.role}, status=status.HTTP_200_OK)
         
         return Response({'error': 'Invalid credentials'}, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=['post'], permission_classes=[AllowAny], authentication_classes=[])
+    def refresh(self, request):
+        """Trade {"refresh": ...} for a new access token and a new refresh token."""
+        try:
+            access, refresh = rotate_refresh_token(request.data.get('refresh'))
+        except AuthenticationFailed as e:
+            return Response({"detail": e.detail}, status=status.HTTP_401_UNAUTHORIZED)
+        return Response({
+            'access': access,
+            'refresh': refresh,
+            'expires_in': settings.AUTH_ACCESS_TOKEN_SECONDS,
+        }, status=status.HTTP_200_OK)
+
     @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated])
     def logout(self, request):
         try:
-            request.user.auth_token.delete() 
+            if request.data.get('refresh'):
+                # The access token itself can't be revoked; it lapses within AUTH_ACCESS_TOKEN_SECONDS.
+                revoke_refresh_token(request.data['refresh'], request.user)
+            if isinstance(request.auth, Token):
+                request.auth.delete()
             return Response({"detail": "Logged out successfully."}, status=200)
         except Exception as e:
             return Response({"detail": str(e)}, status=400)
@@ -118,6 +159,8 @@ class PasswordResetConfirmView(APIView):
                 # Set the new password
                 user.set_password(new_password)
                 user.save()
+                # Sessions opened with the old password end here.
+                revoke_tokens(user)
 
                 return Response({"message": "Password has been reset successfully."}, status=status.HTTP_200_OK)
             except (TypeError, ValueError, OverflowError, CustomUser.DoesNotExist):
@@ -58,6 +58,13 @@ class AssignmentSubmissionAdmin(admin.ModelAdmin):
 
 admin.site.register(AssignmentSubmission, AssignmentSubmissionAdmin)
 
+@admin.register(AssignmentUpload)
+class AssignmentUploadAdmin(admin.ModelAdmin):
+    list_display = ('filename', 'student', 'assignment', 'received', 'size', 'status', 'updated_at')
+    list_filter = ('status',)
+    search_fields = ('filename', 'student__username', 'assignment__title')
+    readonly_fields = ('received', 'created_at', 'updated_at')
+
 
 
 @admin.register(Announcement)
@@ -67,6 +74,19 @@ class AnnouncementAdmin(admin.ModelAdmin):
     list_filter = ('course',)
     ordering = ('-title',)
 
+@admin.register(AnnouncementOutbox)
+class AnnouncementOutboxAdmin(admin.ModelAdmin):
+    list_display = ('announcement', 'status', 'attempts', 'created_at', 'processed_at')
+    list_filter = ('status',)
+    search_fields = ('announcement__title',)
+    readonly_fields = ('created_at', 'processed_at', 'last_error')
+
+@admin.register(AnnouncementDelivery)
+class AnnouncementDeliveryAdmin(admin.ModelAdmin):
+    list_display = ('announcement', 'recipient', 'status', 'attempts', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('announcement__title', 'recipient__username', 'recipient__email')
+
 @admin.register(Quiz)
 class QuizAdmin(admin.ModelAdmin):
     list_display = ('title', 'course', 'due_date', 'time_limit')
@@ -88,6 +108,13 @@ class SubmissionAdmin(admin.ModelAdmin):
     search_fields = ('quiz__title', 'student__username')
     list_filter = ('quiz', 'student')
     ordering = ('-submitted_at',)
+
+@admin.register(QuizAttempt)
+class QuizAttemptAdmin(admin.ModelAdmin):
+    list_display = ('quiz', 'student', 'started_at', 'deadline', 'finalized_at')
+    search_fields = ('quiz__title', 'student__username')
+    list_filter = ('quiz',)
+    ordering = ('-started_at',)
     
     
 class DiscussionReplyInline(admin.TabularInline):
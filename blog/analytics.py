@@ -0,0 +1,290 @@
+import math
+from collections import Counter
+
+import numpy as np
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Max, Sum
+
+from .grading import get_answer_key, load_answer_key, normalize_answer, served_answer_key, student_answer_key
+from .models import Quiz, Question, QuestionStatistic, Submission
+
+REBUILD_CHUNK_SIZE = 2000
+HISTOGRAM_BINS = 10
+SCORE_STATISTICS_TIMEOUT = 5 * 60
+
+
+def record_submission(quiz_id, student_id, answers, score, weight=1, question_ids=None):
+    """
+    Fold one graded submission into the quiz's item statistics. Pass weight=-1 to take
+    a deleted submission back out. Only the questions the student was served count
+    (`question_ids`, the submission's stored draw, or else the student's draw), and
+    only their rows are locked and written, so submissions served different
+    questions don't wait on each other.
+    """
+    quiz = Quiz.objects.filter(pk=quiz_id).only('id', 'questions_per_student', 'questions_version').first()
+    answer_key = get_answer_key(quiz) if quiz is not None else None
+    if not answer_key:
+        return
+    if question_ids is not None:
+        served = served_answer_key(answer_key, question_ids)
+    else:
+        served = student_answer_key(quiz, student_id)
+    if not served:
+        return
+    served_ids = sorted(int(question_id) for question_id in served)
+    answers = {str(question_id): answer for question_id, answer in (answers or {}).items()}
+    score = float(score or 0)
+
+    with transaction.atomic():
+        QuestionStatistic.objects.bulk_create(
+            [QuestionStatistic(quiz_id=quiz_id, question_id=question_id) for question_id in served_ids],
+            ignore_conflicts=True,
+        )
+        statistics = list(
+            QuestionStatistic.objects.select_for_update()
+            .filter(quiz_id=quiz_id, question_id__in=served_ids)
+            .order_by('question_id')
+        )
+        for statistic in statistics:
+            question_id = str(statistic.question_id)
+            statistic.responses += weight
+            statistic.score_sum += weight * score
+            statistic.score_sq_sum += weight * score * score
+            answer = answers.get(question_id)
+            if answer is None:
+                continue
+            normalized = normalize_answer(answer)
+            count = statistic.option_counts.get(normalized, 0) + weight
+            if count > 0:
+                statistic.option_counts[normalized] = count
+            else:
+                statistic.option_counts.pop(normalized, None)
+            if normalized == served[question_id]:
+                statistic.correct += weight
+                statistic.correct_score_sum += weight * score
+        QuestionStatistic.objects.bulk_update(
+            statistics,
+            ['responses', 'correct', 'score_sum', 'score_sq_sum', 'correct_score_sum', 'option_counts'],
+        )
+
+
+class _ItemTotals:
+    """Per-question totals accumulated chunk by chunk during a rebuild."""
+
+    def __init__(self, quiz, answer_key):
+        self.quiz = quiz
+        self.answer_key = answer_key
+        self.question_ids = list(answer_key)
+        self.expected = np.array([answer_key[question_id] for question_id in self.question_ids], dtype=object)
+        size = len(self.question_ids)
+        self.submissions = 0
+        self.responses = np.zeros(size, dtype=np.int64)
+        self.correct = np.zeros(size, dtype=np.int64)
+        self.score_sum = np.zeros(size, dtype=np.float64)
+        self.score_sq_sum = np.zeros(size, dtype=np.float64)
+        self.correct_score_sum = np.zeros(size, dtype=np.float64)
+        self.option_counts = [Counter() for _ in self.question_ids]
+
+    def add(self, chunk):
+        """Fold in a list of (student id, answers, drawn question IDs) triples."""
+        self.submissions += len(chunk)
+        served_rows, given_rows = [], []
+        for student_id, answers, question_ids in chunk:
+            if question_ids is not None:
+                served = served_answer_key(self.answer_key, question_ids)
+            else:
+                served = student_answer_key(self.quiz, student_id)
+            served_rows.append([question_id in served for question_id in self.question_ids])
+            given_rows.append([
+                normalize_answer(answers[question_id])
+                if question_id in served and answers.get(question_id) is not None else None
+                for question_id in self.question_ids
+            ])
+        for row in given_rows:
+            for index, answer in enumerate(row):
+                if answer is not None:
+                    self.option_counts[index][answer] += 1
+
+        # submissions x questions matrices: which questions were served, and which were right.
+        served = np.array(served_rows, dtype=np.float64).reshape(len(chunk), -1)
+        matrix = (np.array(given_rows, dtype=object).reshape(len(chunk), -1) == self.expected).astype(np.float64)
+        scores = matrix.sum(axis=1)
+        self.responses += served.sum(axis=0).astype(np.int64)
+        self.correct += matrix.sum(axis=0).astype(np.int64)
+        self.score_sum += scores @ served
+        self.score_sq_sum += (scores * scores) @ served
+        self.correct_score_sum += scores @ matrix
+
+    def statistics(self):
+        return [
+            QuestionStatistic(
+                quiz_id=self.quiz.id,
+                question_id=int(question_id),
+                responses=int(self.responses[index]),
+                correct=int(self.correct[index]),
+                score_sum=float(self.score_sum[index]),
+                score_sq_sum=float(self.score_sq_sum[index]),
+                correct_score_sum=float(self.correct_score_sum[index]),
+                option_counts=dict(self.option_counts[index]),
+            )
+            for index, question_id in enumerate(self.question_ids)
+        ]
+
+
+def rebuild_item_statistics(quiz_id, chunk_size=REBUILD_CHUNK_SIZE):
+    """
+    Recompute a quiz's item statistics from scratch against its current answer key.
+
+    Submissions are streamed in chunks; each chunk becomes boolean submissions x
+    questions matrices (served, answered correctly) and the per-question totals are
+    accumulated with NumPy reductions. Scores are recomputed from the key so they
+    match it exactly.
+    """
+    quiz = Quiz.objects.get(pk=quiz_id)
+    answer_key = load_answer_key(quiz_id)
+    totals = _ItemTotals(quiz, answer_key)
+    if answer_key:
+        submissions = Submission.objects.filter(quiz_id=quiz_id).values_list('student_id', 'answers', 'question_ids')
+        chunk = []
+        for student_id, answers, question_ids in submissions.iterator(chunk_size=chunk_size):
+            chunk.append((student_id, {str(question_id): answer for question_id, answer in (answers or {}).items()}, question_ids))
+            if len(chunk) == chunk_size:
+                totals.add(chunk)
+                chunk = []
+        if chunk:
+            totals.add(chunk)
+
+    with transaction.atomic():
+        QuestionStatistic.objects.filter(quiz_id=quiz_id).delete()
+        QuestionStatistic.objects.bulk_create(totals.statistics())
+    return totals.submissions
+
+
+def discrimination_index(statistic):
+    """
+    Point-biserial correlation between answering this question correctly and the total
+    score, derived from the running sums. None until both groups are non-empty.
+    """
+    n = statistic.responses
+    correct = statistic.correct
+    if n < 2 or correct in (0, n):
+        return None
+    mean = statistic.score_sum / n
+    variance = statistic.score_sq_sum / n - mean * mean
+    if variance <= 0:
+        return None
+    mean_correct = statistic.correct_score_sum / correct
+    mean_incorrect = (statistic.score_sum - statistic.correct_score_sum) / (n - correct)
+    p = correct / n
+    return round((mean_correct - mean_incorrect) / math.sqrt(variance) * math.sqrt(p * (1 - p)), 4)
+
+
+def item_analysis(quiz_id):
+    """Per-question difficulty, answer distribution and discrimination, read from the statistics table."""
+    statistics = {
+        statistic.question_id: statistic
+        for statistic in QuestionStatistic.objects.filter(quiz_id=quiz_id)
+    }
+    report = []
+    for question_id, text in Question.objects.filter(quiz_id=quiz_id).order_by('id').values_list('id', 'text'):
+        statistic = statistics.get(question_id) or QuestionStatistic(quiz_id=quiz_id, question_id=question_id)
+        report.append({
+            'question': question_id,
+            'text': text,
+            'responses': statistic.responses,
+            'correct': statistic.correct,
+            'difficulty': round(100 * statistic.correct / statistic.responses, 2) if statistic.responses else None,
+            'option_distribution': statistic.option_counts,
+            'discrimination': discrimination_index(statistic),
+        })
+    return report
+
+
+def bump_scores_version(quiz_id):
+    """Retire the cached score statistics of the quiz and its course, on every worker."""
+    Quiz.objects.filter(pk=quiz_id).update(scores_version=F('scores_version') + 1)
+
+
+def score_statistics_version(scope, scope_id):
+    """
+    What the cached statistics of a scope are keyed by: the quiz's scores version, or
+    for a course a fingerprint of its quizzes that changes when any of their scores or
+    questions change, or a quiz is added or deleted.
+    """
+    if scope == 'quiz':
+        return Quiz.objects.filter(pk=scope_id).values_list('scores_version', flat=True).first()
+    quizzes = Quiz.objects.filter(course_id=scope_id).aggregate(
+        count=Count('id'), last=Max('id'), versions=Sum(F('scores_version') + F('questions_version')),
+    )
+    return f"{quizzes['count']}.{quizzes['last']}.{quizzes['versions']}"
+
+
+def score_statistics_cache_key(scope, scope_id, version):
+    return f'blog:score_statistics:{scope}:{scope_id}:{version}'
+
+
+def score_distribution(scores):
+    """Summary statistics, a histogram and percentile ranks for a sequence of scores."""
+    scores = np.fromiter(scores, dtype=np.float64)
+    if scores.size == 0:
+        return {'count': 0, 'mean': None, 'median': None, 'std': None, 'min': None, 'max': None,
+                'histogram': [], 'percentiles': {}, 'percentile_ranks': {}}
+
+    counts, edges = np.histogram(scores, bins=HISTOGRAM_BINS)
+    values, value_counts = np.unique(scores, return_counts=True)
+    # Percentile rank of a score: share of scores strictly below it plus half of the ties.
+    below = np.cumsum(value_counts) - value_counts
+    ranks = 100 * (below + 0.5 * value_counts) / scores.size
+    return {
+        'count': int(scores.size),
+        'mean': round(float(scores.mean()), 4),
+        'median': float(np.median(scores)),
+        'std': round(float(scores.std()), 4),
+        'min': float(scores.min()),
+        'max': float(scores.max()),
+        'histogram': [
+            {'start': round(float(start), 4), 'end': round(float(end), 4), 'count': int(count)}
+            for start, end, count in zip(edges[:-1], edges[1:], counts)
+        ],
+        'percentiles': {
+            str(p): float(value) for p, value in zip((10, 25, 50, 75, 90), np.percentile(scores, [10, 25, 50, 75, 90]))
+        },
+        'percentile_ranks': {
+            f"{value:g}": round(float(rank), 2) for value, rank in zip(values, ranks)
+        },
+    }
+
+
+def course_percentages(course_id):
+    """
+    Every submission score in a course as a percentage of the questions its student
+    was served, so quizzes of different lengths share one scale.
+    """
+    served = {}
+    for quiz_id, per_student, pool in Quiz.objects.filter(course_id=course_id).annotate(
+        pool=Count('questions'),
+    ).values_list('id', 'questions_per_student', 'pool'):
+        served[quiz_id] = min(per_student, pool) if per_student else pool
+    submissions = Submission.objects.exclude(score=None).filter(quiz__course_id=course_id)
+    for quiz_id, score in submissions.values_list('quiz_id', 'score').iterator():
+        if served.get(quiz_id):
+            yield 100 * score / served[quiz_id]
+
+
+def score_statistics(scope, scope_id):
+    """
+    Cached score distribution for one quiz (scope='quiz', raw scores) or every quiz
+    in a course (scope='course', percentages). Keys carry the scope's version, so a
+    changed submission retires the entry in every worker's cache.
+    """
+    key = score_statistics_cache_key(scope, scope_id, score_statistics_version(scope, scope_id))
+    result = cache.get(key)
+    if result is None:
+        if scope == 'quiz':
+            scores = Submission.objects.exclude(score=None).filter(quiz_id=scope_id).values_list('score', flat=True).iterator()
+        else:
+            scores = course_percentages(scope_id)
+        result = score_distribution(scores)
+        cache.set(key, result, SCORE_STATISTICS_TIMEOUT)
+    return result
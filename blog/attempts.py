@@ -0,0 +1,125 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import PermissionDenied, ValidationError
+
+from .grading import draw_questions, grade_submission, student_answer_key
+from .models import QuizAttempt, QuizAttemptAnswer, Submission
+
+# Autosaves that were in flight when the timer ran out are still accepted.
+AUTOSAVE_GRACE = timedelta(seconds=30)
+
+
+def attempt_deadline(quiz, started_at):
+    deadline = quiz.due_date
+    if quiz.time_limit and quiz.time_limit > 0:
+        deadline = min(deadline, started_at + timedelta(minutes=quiz.time_limit))
+    return deadline
+
+
+def attempt_expired(attempt):
+    """True once an unfinalized attempt is past its deadline and the autosave grace period."""
+    return attempt.finalized_at is None and timezone.now() > attempt.deadline + AUTOSAVE_GRACE
+
+
+def start_attempt(quiz, student):
+    """Start (or resume) the student's timed attempt at a quiz. Returns (attempt, created)."""
+    now = timezone.now()
+    attempt = QuizAttempt.objects.filter(quiz=quiz, student=student).first()
+    if attempt is not None:
+        return attempt, False
+    if Submission.objects.filter(quiz=quiz, student=student).exists():
+        raise PermissionDenied("You have already submitted this quiz.")
+    if quiz.due_date <= now:
+        raise PermissionDenied("This quiz is past its due date.")
+    return QuizAttempt.objects.get_or_create(
+        quiz=quiz, student=student,
+        defaults={
+            'started_at': now,
+            'deadline': attempt_deadline(quiz, now),
+            'question_ids': draw_questions(quiz, student.id) if quiz.questions_per_student else None,
+        },
+    )
+
+
+def autosave(attempt, answers):
+    """
+    Append the changed answers to the attempt's log with a single INSERT. Nothing
+    already saved is rewritten; `collect_answers` replays the log.
+    """
+    if attempt.finalized_at is not None or attempt_expired(attempt):
+        raise PermissionDenied("This attempt is closed.")
+    if not isinstance(answers, dict):
+        raise ValidationError({'answers': "Expected an object mapping question IDs to answers."})
+
+    answer_key = student_answer_key(attempt.quiz, attempt.student_id)
+    unknown = [question_id for question_id in answers if str(question_id) not in answer_key]
+    if unknown:
+        raise ValidationError({'answers': f"Unknown question IDs: {', '.join(map(str, unknown))}"})
+    if any(isinstance(answer, (list, dict)) for answer in answers.values()):
+        raise ValidationError({'answers': "Each answer must be a single value, or null to clear it."})
+
+    QuizAttemptAnswer.objects.bulk_create([
+        # null clears an answer; it is not the string 'None'.
+        QuizAttemptAnswer(attempt=attempt, question_id=int(question_id), answer=None if answer is None else str(answer))
+        for question_id, answer in answers.items()
+    ])
+    return len(answers)
+
+
+def collect_answers(attempt):
+    """Latest saved answer per question, keyed like `Submission.answers`. Cleared answers are left out."""
+    answers = {}
+    for question_id, answer in attempt.answer_log.order_by('id').values_list('question_id', 'answer'):
+        answers[str(question_id)] = answer
+    return {question_id: answer for question_id, answer in answers.items() if answer is not None}
+
+
+def finalize_attempt(attempt):
+    """Turn the attempt's saved answers into a graded Submission. Safe to call more than once."""
+    with transaction.atomic():
+        attempt = QuizAttempt.objects.select_for_update(of=('self',)).select_related('quiz').get(pk=attempt.pk)
+        if attempt.finalized_at is not None:
+            return attempt
+        submission = Submission.objects.filter(quiz_id=attempt.quiz_id, student_id=attempt.student_id).first()
+        if submission is None:
+            answers = collect_answers(attempt)
+            submission = Submission.objects.create(
+                quiz_id=attempt.quiz_id,
+                student_id=attempt.student_id,
+                answers=answers,
+                score=grade_submission(attempt.quiz, attempt.student_id, answers),
+                question_ids=attempt.question_ids,
+            )
+        attempt.submission = submission
+        attempt.finalized_at = timezone.now()
+        attempt.save(update_fields=['submission', 'finalized_at'])
+    return attempt
+
+
+def submit_attempt(quiz, student, answers):
+    """
+    Hand in a student's answers through their attempt, so its deadline applies to
+    direct submissions too. Returns the graded Submission.
+    """
+    attempt = QuizAttempt.objects.filter(quiz=quiz, student=student).select_related('quiz').first()
+    if attempt is None:
+        raise PermissionDenied("Start the quiz before submitting it.")
+    if attempt.finalized_at is not None:
+        raise PermissionDenied("You have already submitted this quiz.")
+    if attempt_expired(attempt):
+        finalize_attempt(attempt)
+        raise PermissionDenied("Time is up; your autosaved answers were submitted.")
+    if answers:
+        autosave(attempt, answers)
+    return finalize_attempt(attempt).submission
+
+
+def finalize_expired_attempts(now=None):
+    """Finalize every attempt whose deadline (plus the autosave grace period) has passed."""
+    cutoff = (now or timezone.now()) - AUTOSAVE_GRACE
+    expired = list(QuizAttempt.objects.filter(finalized_at__isnull=True, deadline__lt=cutoff).only('pk'))
+    for attempt in expired:
+        finalize_attempt(attempt)
+    return len(expired)
@@ -0,0 +1,69 @@
+import logging
+import os
+import zipfile
+
+from django.utils import timezone
+
+from .models import AssignmentSubmission
+
+logger = logging.getLogger(__name__)
+
+EXPORT_READ_SIZE = 256 * 1024
+# Submissions are mostly PDFs, archives and video that do not compress further.
+EXPORT_COMPRESSION = zipfile.ZIP_STORED
+
+
+class _ArchiveBuffer:
+    """
+    Write-only sink for ZipFile. It has no seek/tell, so ZipFile writes each entry's
+    sizes in a data descriptor after the entry and never goes back.
+    """
+
+    def __init__(self):
+        self.parts = []
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.parts)
+        self.parts = []
+        return data
+
+
+def archive_entry_name(submission):
+    return f"{submission.student.username}/{os.path.basename(submission.file.name)}"
+
+
+def iter_submissions_zip(assignment):
+    """
+    Yield a ZIP archive of every submitted file for the assignment, piece by piece.
+    Only the read buffer is held in memory; nothing is written to disk.
+    """
+    submissions = (
+        AssignmentSubmission.objects.filter(assignment=assignment)
+        .exclude(file='').exclude(file=None)
+        .select_related('student').only('file', 'submitted_at', 'student__username')
+        .order_by('student__username')
+    )
+    buffer = _ArchiveBuffer()
+    with zipfile.ZipFile(buffer, mode='w', compression=EXPORT_COMPRESSION) as archive:
+        for submission in submissions.iterator():
+            try:
+                source = submission.file.open('rb')
+            except OSError:
+                logger.warning("Skipping missing file %s for submission %s", submission.file.name, submission.pk)
+                continue
+            info = zipfile.ZipInfo(archive_entry_name(submission), timezone.localtime(submission.submitted_at).timetuple()[:6])
+            info.compress_type = EXPORT_COMPRESSION
+            with source, archive.open(info, mode='w', force_zip64=True) as entry:
+                for chunk in source.chunks(EXPORT_READ_SIZE):
+                    entry.write(chunk)
+                    yield buffer.drain()
+            yield buffer.drain()
+    # Closing the archive wrote the central directory.
+    yield buffer.drain()
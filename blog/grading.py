@@ -0,0 +1,157 @@
+import hashlib
+import hmac
+import random
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+
+from .models import Quiz, Question, QuizAttempt, Submission
+
+ANSWER_KEY_TIMEOUT = 60 * 60
+QUESTION_DRAW_TIMEOUT = 24 * 60 * 60
+REGRADE_CHUNK_SIZE = 500
+
+
+def answer_key_cache_key(quiz):
+    # Versioned by the quiz row, so a question edited on any worker retires every cached copy.
+    return f'blog:answer_key:{quiz.id}:{quiz.questions_version}'
+
+
+def normalize_answer(answer):
+    return str(answer).lower()
+
+
+def load_answer_key(quiz_id):
+    """Build the answer key for a quiz: {question id (str): lowercased correct answer}."""
+    return {
+        str(question_id): normalize_answer(correct_answer)
+        for question_id, correct_answer in Question.objects.filter(quiz_id=quiz_id).values_list('id', 'correct_answer')
+    }
+
+
+def get_answer_key(quiz):
+    """Cached answer key for a quiz; one query on a miss, none on a hit."""
+    key = answer_key_cache_key(quiz)
+    answer_key = cache.get(key)
+    if answer_key is None:
+        answer_key = load_answer_key(quiz.id)
+        cache.set(key, answer_key, ANSWER_KEY_TIMEOUT)
+    return answer_key
+
+
+def bump_questions_version(quiz_id):
+    Quiz.objects.filter(pk=quiz_id).update(questions_version=F('questions_version') + 1)
+
+
+def grade_answers(answers, answer_key):
+    """Count the correct answers in a submission's `answers` dict. Pure, no queries."""
+    correct = 0
+    for question_id, answer in answers.items():
+        expected = answer_key.get(str(question_id))
+        if expected is not None and answer is not None and normalize_answer(answer) == expected:
+            correct += 1
+    return correct
+
+
+def question_draw_cache_key(quiz, student_id):
+    # Versioned like the answer key, so after a pool edit every worker rereads the stored
+    # draw, and keyed by the draw size, so changing it draws afresh for students who haven't started.
+    return f'blog:question_draw:{quiz.id}:{quiz.questions_version}:{quiz.questions_per_student}:{student_id}'
+
+
+def stored_draw(quiz_id, student_id):
+    """The draw recorded on the student's attempt or submission, or None."""
+    for model in (QuizAttempt, Submission):
+        drawn = model.objects.filter(quiz_id=quiz_id, student_id=student_id).exclude(
+            question_ids=None,
+        ).values_list('question_ids', flat=True).first()
+        if drawn is not None:
+            return drawn
+    return None
+
+
+def draw_questions(quiz, student_id):
+    """
+    IDs (as strings) of the questions this student is served. Quizzes with
+    `questions_per_student` draw that many from the pool using a seed derived from
+    the quiz and student, so the draw is reproducible. Once the student starts an
+    attempt the draw is stored on it (and later on the submission), so it stays the
+    same even if the pool is edited.
+    """
+    answer_key = get_answer_key(quiz)
+    count = quiz.questions_per_student
+    if not count or count >= len(answer_key):
+        return list(answer_key)
+
+    key = question_draw_cache_key(quiz, student_id)
+    drawn = cache.get(key)
+    if drawn is None:
+        drawn = stored_draw(quiz.id, student_id)
+        if drawn is None:
+            digest = hmac.new(settings.SECRET_KEY.encode(), f'{quiz.id}:{student_id}'.encode(), hashlib.sha256).digest()
+            pool = sorted(answer_key, key=int)
+            drawn = sorted(random.Random(int.from_bytes(digest[:8], 'big')).sample(pool, count), key=int)
+        cache.set(key, drawn, QUESTION_DRAW_TIMEOUT)
+    return drawn
+
+
+def served_answer_key(answer_key, question_ids):
+    """`answer_key` restricted to `question_ids`; None means every question was served."""
+    if question_ids is None:
+        return answer_key
+    return {question_id: answer_key[question_id] for question_id in question_ids if question_id in answer_key}
+
+
+def student_answer_key(quiz, student_id):
+    """The quiz's answer key restricted to the questions drawn for this student."""
+    answer_key = get_answer_key(quiz)
+    if not quiz.questions_per_student:
+        return answer_key
+    return served_answer_key(answer_key, draw_questions(quiz, student_id))
+
+
+def grade_submission(quiz, student_id, answers):
+    """Score a student's answers against the questions they were served. No queries on a warm cache."""
+    return grade_answers(answers or {}, student_answer_key(quiz, student_id))
+
+
+def regrade_quiz(quiz_id, chunk_size=REGRADE_CHUNK_SIZE):
+    """
+    Re-score every submission of a quiz against its current answer key.
+
+    Submissions are paged by primary key in chunks of `chunk_size`, graded in memory
+    and only the rows whose score actually changed are written back with `bulk_update`.
+    """
+    quiz = Quiz.objects.get(pk=quiz_id)
+    answer_key = load_answer_key(quiz_id)
+    cache.set(answer_key_cache_key(quiz), answer_key, ANSWER_KEY_TIMEOUT)
+
+    total = changed = 0
+    last_id = 0
+    while True:
+        chunk = list(
+            Submission.objects.filter(quiz_id=quiz_id, id__gt=last_id)
+            .order_by('id')
+            .only('id', 'student_id', 'answers', 'score', 'question_ids')[:chunk_size]
+        )
+        if not chunk:
+            break
+        stale = []
+        for submission in chunk:
+            if submission.question_ids is not None:
+                score = grade_answers(submission.answers, served_answer_key(answer_key, submission.question_ids))
+            elif quiz.questions_per_student:
+                score = grade_answers(submission.answers, student_answer_key(quiz, submission.student_id))
+            else:
+                score = grade_answers(submission.answers, answer_key)
+            if score != submission.score:
+                submission.score = score
+                stale.append(submission)
+        if stale:
+            Submission.objects.bulk_update(stale, ['score'])
+        total += len(chunk)
+        changed += len(stale)
+        last_id = chunk[-1].id
+
+    return {'quiz': quiz_id, 'submissions': total, 'changed': changed}
@@ -0,0 +1,200 @@
+import csv
+import io
+import json
+import os
+
+from django.db import transaction
+from rest_framework import serializers
+
+from .models import Quiz, Question
+from .serializers import invalidate_quiz_caches
+
+IMPORT_BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 100
+IMPORT_FORMATS = {
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+    '.csv': 'csv',
+}
+
+
+class QuestionImportRowSerializer(serializers.Serializer):
+    """
+    One row of a question bank. A row either targets an existing quiz with `quiz_id`
+    or names a quiz with `quiz`; the first row naming a new quiz also has to carry
+    its `due_date` and `time_limit`.
+    """
+    quiz_id = serializers.IntegerField(required=False)
+    quiz = serializers.CharField(max_length=255, required=False)
+    quiz_description = serializers.CharField(required=False, allow_blank=True, default='')
+    due_date = serializers.DateTimeField(required=False)
+    time_limit = serializers.IntegerField(required=False)
+    text = serializers.CharField()
+    question_type = serializers.ChoiceField(choices=Question._meta.get_field('question_type').choices)
+    correct_answer = serializers.CharField()
+    options = serializers.JSONField(required=False, default=list)
+
+    def to_internal_value(self, data):
+        # Blank CSV cells mean "not given", not "empty string".
+        data = {key: value for key, value in data.items() if value not in ('', None)}
+        return super().to_internal_value(data)
+
+    def validate_options(self, value):
+        if isinstance(value, str):
+            value = value.strip()
+            if value.startswith('['):
+                try:
+                    value = json.loads(value)
+                except ValueError:
+                    raise serializers.ValidationError("Options must be a JSON list or '|'-separated values.")
+            else:
+                value = [option.strip() for option in value.split('|') if option.strip()]
+        if not isinstance(value, list):
+            raise serializers.ValidationError("Options must be a list.")
+        return value
+
+    def validate(self, attrs):
+        if 'quiz_id' not in attrs and 'quiz' not in attrs:
+            raise serializers.ValidationError("Either quiz_id or quiz is required.")
+        return attrs
+
+
+def detect_format(filename, fmt=None):
+    if fmt:
+        if fmt not in IMPORT_FORMATS.values():
+            raise ValueError(f"Unsupported format '{fmt}'.")
+        return fmt
+    extension = os.path.splitext(filename or '')[1].lower()
+    if extension not in IMPORT_FORMATS:
+        raise ValueError("Cannot tell the file format; use a .jsonl or .csv file or pass the format explicitly.")
+    return IMPORT_FORMATS[extension]
+
+
+def iter_rows(textfile, fmt):
+    """Yield (line number, row dict or error message) one row at a time."""
+    if fmt == 'csv':
+        reader = csv.DictReader(textfile)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for line_number, line in enumerate(textfile, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_number, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(row, dict):
+            yield line_number, "Each line must be a JSON object."
+            continue
+        yield line_number, row
+
+
+class QuestionBankImporter:
+    """
+    Streams a question bank into a course. Rows are validated one at a time and
+    buffered; every `batch_size` valid rows the new quizzes and their questions are
+    written with `bulk_create` in one transaction. Invalid rows are reported and skipped.
+    """
+
+    def __init__(self, course, batch_size=IMPORT_BATCH_SIZE):
+        self.course = course
+        self.batch_size = batch_size
+        self.new_quizzes = {}
+        self.existing_quizzes = {}
+        self.pending_quizzes = []
+        self.pending_questions = []
+        self.touched_quiz_ids = set()
+        self.report = {'rows': 0, 'imported': 0, 'quizzes_created': 0, 'error_count': 0, 'errors': []}
+
+    def add_error(self, line_number, errors):
+        self.report['error_count'] += 1
+        if len(self.report['errors']) < MAX_REPORTED_ERRORS:
+            self.report['errors'].append({'line': line_number, 'errors': errors})
+
+    def resolve_quiz(self, attrs):
+        if 'quiz_id' in attrs:
+            quiz_id = attrs['quiz_id']
+            if quiz_id not in self.existing_quizzes:
+                self.existing_quizzes[quiz_id] = Quiz.objects.filter(id=quiz_id, course=self.course).first()
+            quiz = self.existing_quizzes[quiz_id]
+            if quiz is None:
+                raise serializers.ValidationError(f"Quiz {quiz_id} does not exist in this course.")
+            self.touched_quiz_ids.add(quiz_id)
+            return quiz
+
+        title = attrs['quiz']
+        quiz = self.new_quizzes.get(title)
+        if quiz is None:
+            if 'due_date' not in attrs or 'time_limit' not in attrs:
+                raise serializers.ValidationError(f"The first row for quiz '{title}' needs due_date and time_limit.")
+            quiz = Quiz(
+                title=title,
+                description=attrs['quiz_description'],
+                course=self.course,
+                due_date=attrs['due_date'],
+                time_limit=attrs['time_limit'],
+            )
+            self.new_quizzes[title] = quiz
+            self.pending_quizzes.append(quiz)
+        return quiz
+
+    def add_row(self, line_number, row):
+        self.report['rows'] += 1
+        if isinstance(row, str):
+            self.add_error(line_number, [row])
+            return
+        serializer = QuestionImportRowSerializer(data=row)
+        if not serializer.is_valid():
+            self.add_error(line_number, serializer.errors)
+            return
+        attrs = serializer.validated_data
+        try:
+            quiz = self.resolve_quiz(attrs)
+        except serializers.ValidationError as e:
+            self.add_error(line_number, e.detail)
+            return
+        self.pending_questions.append(Question(
+            quiz=quiz,
+            text=attrs['text'],
+            question_type=attrs['question_type'],
+            correct_answer=attrs['correct_answer'],
+            options=attrs['options'],
+        ))
+        if len(self.pending_questions) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        with transaction.atomic():
+            if self.pending_quizzes:
+                Quiz.objects.bulk_create(self.pending_quizzes)
+                self.report['quizzes_created'] += len(self.pending_quizzes)
+            if self.pending_questions:
+                Question.objects.bulk_create(self.pending_questions, batch_size=self.batch_size)
+                self.report['imported'] += len(self.pending_questions)
+        self.pending_quizzes = []
+        self.pending_questions = []
+
+    def run(self, textfile, fmt):
+        try:
+            for line_number, row in iter_rows(textfile, fmt):
+                self.add_row(line_number, row)
+        except UnicodeDecodeError:
+            # Rows before the bad bytes are kept, like any other rejected row's neighbours.
+            self.report['detail'] = "The file is not valid UTF-8; reading stopped at the first invalid byte."
+        self.flush()
+        for quiz_id in self.touched_quiz_ids:
+            invalidate_quiz_caches(quiz_id)
+        return self.report
+
+
+def import_question_bank(binary_file, course, fmt, batch_size=IMPORT_BATCH_SIZE):
+    """Import a JSONL or CSV question bank read from a binary file object."""
+    textfile = io.TextIOWrapper(binary_file, encoding='utf-8-sig', newline='')
+    try:
+        return QuestionBankImporter(course, batch_size).run(textfile, fmt)
+    finally:
+        # Leave closing the underlying file to its owner.
+        textfile.detach()
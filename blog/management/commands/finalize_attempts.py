@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from blog.attempts import finalize_expired_attempts
+
+
+class Command(BaseCommand):
+    help = "Turn quiz attempts whose deadline has passed into graded submissions. Run it every minute or so."
+
+    def handle(self, *args, **options):
+        finalized = finalize_expired_attempts()
+        self.stdout.write(self.style.SUCCESS(f"Finalized {finalized} expired attempt(s)."))
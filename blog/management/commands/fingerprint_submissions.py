@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.models import Assignment
+from blog.similarity import fingerprint_assignment
+
+
+class Command(BaseCommand):
+    help = "Fingerprint submitted files and refresh the near-duplicate pairs of the given assignments."
+
+    def add_arguments(self, parser):
+        parser.add_argument('assignment_ids', nargs='*', type=int)
+        parser.add_argument('--all', action='store_true', help="Fingerprint every assignment.")
+
+    def handle(self, *args, **options):
+        if options['all']:
+            assignment_ids = list(Assignment.objects.values_list('id', flat=True))
+        elif options['assignment_ids']:
+            assignment_ids = options['assignment_ids']
+        else:
+            raise CommandError("Pass one or more assignment IDs or --all.")
+
+        for assignment_id in assignment_ids:
+            count = fingerprint_assignment(assignment_id)
+            self.stdout.write(f"Assignment {assignment_id}: fingerprinted {count} submission(s).")
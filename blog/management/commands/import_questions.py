@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.importers import IMPORT_BATCH_SIZE, detect_format, import_question_bank
+from courses.models import Course
+
+
+class Command(BaseCommand):
+    help = "Import quizzes and questions from a JSONL or CSV question bank into a course."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--course', type=int, required=True, help="ID of the course to import into.")
+        parser.add_argument('--format', choices=['jsonl', 'csv'], default=None,
+                            help="File format; detected from the extension when omitted.")
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE,
+                            help="Number of questions inserted per bulk_create batch.")
+
+    def handle(self, *args, **options):
+        course = Course.objects.filter(id=options['course']).first()
+        if course is None:
+            raise CommandError(f"Course {options['course']} does not exist.")
+        try:
+            fmt = detect_format(options['path'], options['format'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        with open(options['path'], 'rb') as bank:
+            report = import_question_bank(bank, course, fmt, options['batch_size'])
+
+        for error in report['errors']:
+            self.stderr.write(f"Line {error['line']}: {error['errors']}")
+        if 'detail' in report:
+            self.stderr.write(report['detail'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {report['imported']} of {report['rows']} question(s) into "
+            f"{report['quizzes_created']} new quiz(zes); {report['error_count']} row(s) rejected."
+        ))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from blog.uploads import purge_stale_uploads
+
+
+class Command(BaseCommand):
+    help = "Delete resumable assignment uploads that were abandoned, along with their spooled chunks."
+
+    def handle(self, *args, **options):
+        purged = purge_stale_uploads()
+        self.stdout.write(self.style.SUCCESS(f"Purged {purged} stale upload(s)."))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.analytics import REBUILD_CHUNK_SIZE, rebuild_item_statistics
+from blog.models import Quiz
+
+
+class Command(BaseCommand):
+    help = "Recompute per-question item-analysis statistics from all submissions."
+
+    def add_arguments(self, parser):
+        parser.add_argument('quiz_ids', nargs='*', type=int)
+        parser.add_argument('--all', action='store_true', help="Rebuild every quiz.")
+        parser.add_argument('--chunk-size', type=int, default=REBUILD_CHUNK_SIZE,
+                            help="Number of submissions processed per NumPy batch.")
+
+    def handle(self, *args, **options):
+        if options['all']:
+            quiz_ids = list(Quiz.objects.values_list('id', flat=True))
+        elif options['quiz_ids']:
+            quiz_ids = options['quiz_ids']
+        else:
+            raise CommandError("Pass one or more quiz IDs or --all.")
+
+        for quiz_id in quiz_ids:
+            responses = rebuild_item_statistics(quiz_id, options['chunk_size'])
+            self.stdout.write(f"Quiz {quiz_id}: rebuilt from {responses} submission(s).")
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.analytics import bump_scores_version, rebuild_item_statistics
+from blog.grading import REGRADE_CHUNK_SIZE, regrade_quiz
+from blog.models import Quiz
+
+
+class Command(BaseCommand):
+    help = "Re-score all submissions of the given quizzes against their current answer keys."
+
+    def add_arguments(self, parser):
+        parser.add_argument('quiz_ids', nargs='+', type=int)
+        parser.add_argument('--chunk-size', type=int, default=REGRADE_CHUNK_SIZE,
+                            help="Number of submissions loaded and updated per batch.")
+
+    def handle(self, *args, **options):
+        found = set(Quiz.objects.filter(id__in=options['quiz_ids']).values_list('id', flat=True))
+        missing = set(options['quiz_ids']) - found
+        if missing:
+            raise CommandError(f"Quiz(zes) not found: {', '.join(map(str, sorted(missing)))}")
+
+        for quiz_id in options['quiz_ids']:
+            result = regrade_quiz(quiz_id, options['chunk_size'])
+            rebuild_item_statistics(quiz_id)
+            bump_scores_version(quiz_id)
+            self.stdout.write(
+                f"Quiz {quiz_id}: {result['changed']} of {result['submissions']} submission score(s) changed."
+            )
@@ -0,0 +1,37 @@
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from blog.notifications import DEFAULT_CHUNK_SIZE, claim_job, claimable_jobs, deliver_announcement
+
+
+class Command(BaseCommand):
+    help = "Deliver queued announcement emails to enrolled students, reclaiming jobs of crashed workers."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                            help="Number of recipients fetched and mailed per batch.")
+        parser.add_argument('--max-attempts', type=int, default=5,
+                            help="Stop retrying a failed job after this many attempts.")
+        parser.add_argument('--limit', type=int, default=None,
+                            help="Process at most this many jobs in this run.")
+
+    def handle(self, *args, **options):
+        jobs = (
+            claimable_jobs()
+            .filter(attempts__lt=options['max_attempts'])
+            .select_related('announcement__course')
+            .order_by('created_at')
+        )
+        if options['limit']:
+            jobs = jobs[:options['limit']]
+
+        processed = 0
+        with get_connection() as connection:
+            for job in jobs:
+                if not claim_job(job):
+                    continue
+                sent, failed = deliver_announcement(job, options['chunk_size'], connection)
+                processed += 1
+                self.stdout.write(f"Announcement {job.announcement_id}: {sent} sent, {failed} failed.")
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} announcement job(s)."))
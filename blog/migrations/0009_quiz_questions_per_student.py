@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 18:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_questionstatistic'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quiz',
+            name='questions_per_student',
+            field=models.PositiveIntegerField(blank=True, help_text="Draw this many questions per student from the quiz's questions; empty serves them all", null=True),
+        ),
+    ]
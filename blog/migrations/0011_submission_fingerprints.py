@@ -0,0 +1,55 @@
+# Generated by Django 5.1.1 on 2026-10-18 18:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_assignmentupload'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubmissionFingerprint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file_name', models.CharField(max_length=255)),
+                ('signature', models.BinaryField(blank=True, null=True)),
+                ('shingles', models.PositiveIntegerField(default=0)),
+                ('status', models.CharField(choices=[('ok', 'OK'), ('empty', 'No text'), ('unsupported', 'Unsupported format'), ('failed', 'Failed')], default='ok', max_length=20)),
+                ('error', models.TextField(blank=True)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+                ('assignment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fingerprints', to='blog.assignment')),
+                ('submission', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='fingerprint', to='blog.assignmentsubmission')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SimilarSubmissionPair',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('similarity', models.FloatField()),
+                ('detected_at', models.DateTimeField(auto_now=True)),
+                ('assignment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_pairs', to='blog.assignment')),
+                ('first', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='blog.assignmentsubmission')),
+                ('second', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='blog.assignmentsubmission')),
+            ],
+            options={
+                'unique_together': {('first', 'second')},
+            },
+        ),
+        migrations.CreateModel(
+            name='SubmissionBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band', models.PositiveSmallIntegerField()),
+                ('bucket', models.BigIntegerField()),
+                ('assignment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='blog.assignment')),
+                ('fingerprint', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='buckets', to='blog.submissionfingerprint')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['assignment', 'band', 'bucket'], name='blog_submis_assignm_19a488_idx')],
+            },
+        ),
+    ]
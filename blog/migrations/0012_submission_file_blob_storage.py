@@ -0,0 +1,20 @@
+# Generated by Django 5.1.1 on 2026-10-18 18:20
+
+import resources.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_submission_fingerprints'),
+        ('resources', '0003_stored_blobs'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='assignmentsubmission',
+            name='file',
+            field=models.FileField(blank=True, max_length=255, null=True, storage=resources.storage.ContentAddressedStorage(), upload_to='assignment_submissions/'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 18:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_submission_file_blob_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='announcementoutbox',
+            name='locked_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
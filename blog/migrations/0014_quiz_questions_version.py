@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 18:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_announcementoutbox_locked_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quiz',
+            name='questions_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
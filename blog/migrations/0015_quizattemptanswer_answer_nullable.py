@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 18:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0014_quiz_questions_version'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='quizattemptanswer',
+            name='answer',
+            field=models.TextField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.1 on 2026-10-18 18:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0015_quizattemptanswer_answer_nullable'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizattempt',
+            name='question_ids',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='submission',
+            name='question_ids',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 19:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0016_question_draws'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quiz',
+            name='scores_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -4,6 +4,7 @@ from django.utils import timezone
 from django.core.mail import send_mail
 from users.models import CustomUser
 from courses.models import Course
+from resources.storage import content_addressed_storage
 
 
 class Assignment(models.Model):
@@ -18,7 +19,7 @@ class Assignment(models.Model):
 class AssignmentSubmission(models.Model):
     student = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, limit_choices_to={'role': 'student'}, related_name='submissions')
     assignment = models.ForeignKey('Assignment', on_delete=models.CASCADE, related_name='submissions')
-    file = models.FileField(upload_to='assignment_submissions/', blank=True, null=True)
+    file = models.FileField(upload_to='assignment_submissions/', storage=content_addressed_storage, max_length=255, blank=True, null=True)
     submitted_at = models.DateTimeField(default=timezone.now)
     
     def __str__(self):
@@ -27,6 +28,75 @@ class AssignmentSubmission(models.Model):
     class Meta:
         unique_together = ('student', 'assignment')
 
+class SubmissionFingerprint(models.Model):
+    """MinHash signature of a submission's extracted text, used for near-duplicate screening."""
+    STATUS_CHOICES = [
+        ('ok', 'OK'),
+        ('empty', 'No text'),
+        ('unsupported', 'Unsupported format'),
+        ('failed', 'Failed'),
+    ]
+
+    submission = models.OneToOneField(AssignmentSubmission, related_name='fingerprint', on_delete=models.CASCADE)
+    assignment = models.ForeignKey(Assignment, related_name='fingerprints', on_delete=models.CASCADE)
+    file_name = models.CharField(max_length=255)
+    signature = models.BinaryField(null=True, blank=True)
+    shingles = models.PositiveIntegerField(default=0)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='ok')
+    error = models.TextField(blank=True)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Fingerprint of submission {self.submission_id} ({self.status})"
+
+class SubmissionBucket(models.Model):
+    """One LSH band of a fingerprint; fingerprints sharing a bucket are candidate duplicates."""
+    fingerprint = models.ForeignKey(SubmissionFingerprint, related_name='buckets', on_delete=models.CASCADE)
+    assignment = models.ForeignKey(Assignment, related_name='+', on_delete=models.CASCADE)
+    band = models.PositiveSmallIntegerField()
+    bucket = models.BigIntegerField()
+
+    class Meta:
+        indexes = [models.Index(fields=['assignment', 'band', 'bucket'])]
+
+class SimilarSubmissionPair(models.Model):
+    """A pair of submissions whose estimated similarity passed the threshold; `first` has the lower ID."""
+    assignment = models.ForeignKey(Assignment, related_name='similar_pairs', on_delete=models.CASCADE)
+    first = models.ForeignKey(AssignmentSubmission, related_name='+', on_delete=models.CASCADE)
+    second = models.ForeignKey(AssignmentSubmission, related_name='+', on_delete=models.CASCADE)
+    similarity = models.FloatField()
+    detected_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Submissions {self.first_id} and {self.second_id}: {self.similarity:.0%}"
+
+    class Meta:
+        unique_together = ('first', 'second')
+
+class AssignmentUpload(models.Model):
+    """
+    A resumable upload of an assignment submission file. Chunks are spooled to
+    `spool_path` in order; `received` is the offset the next chunk has to start at.
+    """
+    STATUS_CHOICES = [
+        ('open', 'Open'),
+        ('complete', 'Complete'),
+    ]
+
+    student = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='assignment_uploads', on_delete=models.CASCADE)
+    assignment = models.ForeignKey(Assignment, related_name='uploads', on_delete=models.CASCADE)
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    chunk_size = models.PositiveIntegerField()
+    received = models.PositiveBigIntegerField(default=0)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='open', db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    submission = models.ForeignKey(AssignmentSubmission, related_name='uploads', null=True, blank=True, on_delete=models.SET_NULL)
+
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.size} bytes)"
+
 class Announcement(models.Model):
     title = models.CharField(max_length=255)
     message = models.TextField()
@@ -35,15 +105,74 @@ class Announcement(models.Model):
     def __str__(self):
         return self.title
 
+class AnnouncementOutbox(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    announcement = models.OneToOneField(Announcement, related_name='outbox', on_delete=models.CASCADE)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', db_index=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    # Set when a worker claims the job; a 'processing' job whose lease ran out is claimable again.
+    locked_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.announcement.title} ({self.status})"
+
+class AnnouncementDelivery(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    announcement = models.ForeignKey(Announcement, related_name='deliveries', on_delete=models.CASCADE)
+    recipient = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='announcement_deliveries', on_delete=models.CASCADE)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.announcement.title} -> {self.recipient_id} ({self.status})"
+
+    class Meta:
+        unique_together = ('announcement', 'recipient')
+
 class Quiz(models.Model):
     title = models.CharField(max_length=255)
     description = models.TextField()
     course = models.ForeignKey(Course, related_name='quizzes', on_delete=models.CASCADE)
     due_date = models.DateTimeField()
     time_limit = models.IntegerField(help_text="Time limit in minutes")
+    questions_per_student = models.PositiveIntegerField(null=True, blank=True, help_text="Draw this many questions per student from the quiz's questions; empty serves them all")
+    # Bumped whenever a question changes; cached answer keys and payloads are keyed by it.
+    questions_version = models.PositiveIntegerField(default=0, editable=False)
+    # Bumped whenever a submission changes; cached score statistics are keyed by it.
+    scores_version = models.PositiveIntegerField(default=0, editable=False)
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        # The versions only move through F() updates (bump_questions_version, bump_scores_version);
+        # saving the other fields must not write back the values this instance read.
+        if not self._state.adding and not kwargs.get('force_insert'):
+            update_fields = kwargs.get('update_fields')
+            if update_fields is None:
+                deferred = self.get_deferred_fields()
+                update_fields = [
+                    field.name for field in self._meta.concrete_fields
+                    if not field.primary_key and field.attname not in deferred
+                ]
+            kwargs['update_fields'] = [name for name in update_fields if name not in ('questions_version', 'scores_version')]
+        super().save(*args, **kwargs)
+
 class Question(models.Model):
     quiz = models.ForeignKey(Quiz, related_name='questions', on_delete=models.CASCADE)
     text = models.TextField()
@@ -60,29 +189,63 @@ class Submission(models.Model):
     submitted_at = models.DateTimeField(auto_now_add=True)
     score = models.IntegerField(null=True, blank=True)
     answers = models.JSONField(default=dict)  
+    # Question IDs drawn for the student when the quiz serves a subset; null means all of them.
+    question_ids = models.JSONField(null=True, blank=True, editable=False)
 
     def __str__(self):
         return f"{self.student.username} submitted {self.quiz.title}"
 
     def calculate_score(self):
-        correct_answers = 0
-        for question_id, answer in self.answers.items():
-            try:
-                question = Question.objects.get(id=question_id)
-                print(f"Question ID: {question_id}, Submitted Answer: {answer}, Correct Answer: {question.correct_answer}")
-
-                if question.correct_answer.lower() == answer.lower():
-                    correct_answers += 1
-                    print("Correct answer!")
-                else:
-                    print("Incorrect answer.")
-
-            except Question.DoesNotExist:
-                print(f"Question with ID {question_id} does not exist.")
-
-        self.score = correct_answers
-        print(f"Final score for {self.student.username}: {self.score}")
-        self.save()
+        """Grade `answers` against the quiz's cached answer key. Sets `score` but does not save."""
+        from .grading import grade_submission
+        self.score = grade_submission(self.quiz, self.student_id, self.answers)
+        return self.score
+
+class QuestionStatistic(models.Model):
+    """
+    Running item-analysis totals for one question, updated as submissions are graded.
+    `responses` counts the graded submissions that were served this question, answered
+    or not; the score sums are of those submissions' total scores and feed the
+    discrimination index.
+    """
+    question = models.OneToOneField(Question, related_name='statistic', on_delete=models.CASCADE)
+    quiz = models.ForeignKey(Quiz, related_name='question_statistics', on_delete=models.CASCADE)
+    responses = models.PositiveIntegerField(default=0)
+    correct = models.PositiveIntegerField(default=0)
+    score_sum = models.FloatField(default=0)
+    score_sq_sum = models.FloatField(default=0)
+    correct_score_sum = models.FloatField(default=0)
+    option_counts = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Statistics for question {self.question_id}"
+
+class QuizAttempt(models.Model):
+    quiz = models.ForeignKey(Quiz, related_name='attempts', on_delete=models.CASCADE)
+    student = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='quiz_attempts', on_delete=models.CASCADE)
+    started_at = models.DateTimeField(default=timezone.now)
+    deadline = models.DateTimeField(db_index=True)
+    finalized_at = models.DateTimeField(null=True, blank=True)
+    submission = models.OneToOneField(Submission, related_name='attempt', null=True, blank=True, on_delete=models.SET_NULL)
+    # The student's question draw, fixed when the attempt starts.
+    question_ids = models.JSONField(null=True, blank=True, editable=False)
+
+    def __str__(self):
+        return f"{self.student.username} attempting {self.quiz.title}"
+
+    class Meta:
+        unique_together = ('quiz', 'student')
+
+class QuizAttemptAnswer(models.Model):
+    """Append-only autosave log; the latest row per question wins when an attempt is finalized."""
+    attempt = models.ForeignKey(QuizAttempt, related_name='answer_log', on_delete=models.CASCADE)
+    question_id = models.BigIntegerField()
+    answer = models.TextField(null=True, blank=True)
+    saved_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Attempt {self.attempt_id}, question {self.question_id}"
         
 class DiscussionThread(models.Model):
     course = models.ForeignKey(Course, related_name='discussion_threads', on_delete=models.CASCADE)
@@ -0,0 +1,118 @@
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import AnnouncementOutbox, AnnouncementDelivery
+
+ANNOUNCEMENT_FROM_EMAIL = 'no-reply@example.com'
+DEFAULT_CHUNK_SIZE = 200
+# A worker renews its lease after every chunk; a job not renewed for this long belongs to a crashed worker.
+JOB_LEASE = timedelta(minutes=15)
+
+
+def enqueue_announcement(announcement):
+    """Record a delivery job for the announcement; the mail itself is sent by `send_announcements`."""
+    job, _ = AnnouncementOutbox.objects.get_or_create(announcement=announcement)
+    return job
+
+
+def claimable_jobs(now=None):
+    """Pending and failed jobs, plus processing ones whose worker stopped renewing its lease."""
+    stale = (now or timezone.now()) - JOB_LEASE
+    return AnnouncementOutbox.objects.filter(
+        Q(status__in=['pending', 'failed']) | Q(status='processing', locked_at__lt=stale) | Q(status='processing', locked_at=None)
+    )
+
+
+def claim_job(job):
+    """Mark a claimable job as processing. Returns False if another worker got it first."""
+    now = timezone.now()
+    claimed = claimable_jobs(now).filter(pk=job.pk).update(
+        status='processing', attempts=F('attempts') + 1, locked_at=now,
+    )
+    return claimed == 1
+
+
+def renew_lease(job):
+    AnnouncementOutbox.objects.filter(pk=job.pk, status='processing').update(locked_at=timezone.now())
+
+
+def pending_recipients(announcement):
+    """(id, email) pairs of enrolled students who have not been sent this announcement yet."""
+    already_sent = AnnouncementDelivery.objects.filter(
+        announcement=announcement, status='sent'
+    ).values('recipient_id')
+    return (
+        announcement.course.students
+        .exclude(email='')
+        .exclude(id__in=already_sent)
+        .order_by('id')
+        .values_list('id', 'email')
+    )
+
+
+def iter_recipient_chunks(announcement, chunk_size):
+    """Page through pending recipients by primary key so no cursor stays open while we write."""
+    last_id = 0
+    while True:
+        chunk = list(pending_recipients(announcement).filter(id__gt=last_id)[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1][0]
+
+
+def deliver_announcement(job, chunk_size=DEFAULT_CHUNK_SIZE, connection=None):
+    """
+    Send the job's announcement to every enrolled student that has not received it yet.
+
+    Recipients are streamed in chunks of `chunk_size`. Every message goes out over
+    the shared SMTP connection on its own, so a failure part-way through a chunk only
+    marks the recipients that didn't get it; a retry skips everyone marked sent.
+    Delivery rows are updated in bulk per chunk. Returns a (sent, failed) tuple.
+    """
+    if connection is None:
+        with get_connection() as connection:
+            return deliver_announcement(job, chunk_size, connection)
+
+    announcement = job.announcement
+    subject = f"New Announcement in {announcement.course.name}"
+    sent = failed = 0
+    last_error = ''
+
+    for chunk in iter_recipient_chunks(announcement, chunk_size):
+        recipient_ids = [recipient_id for recipient_id, _ in chunk]
+        AnnouncementDelivery.objects.bulk_create(
+            [AnnouncementDelivery(announcement=announcement, recipient_id=recipient_id) for recipient_id in recipient_ids],
+            ignore_conflicts=True,
+        )
+        delivered, errors = [], {}
+        for recipient_id, email in chunk:
+            message = EmailMessage(subject, announcement.message, ANNOUNCEMENT_FROM_EMAIL, [email], connection=connection)
+            try:
+                message.send(fail_silently=False)
+            except Exception as e:
+                last_error = str(e)
+                errors.setdefault(last_error, []).append(recipient_id)
+            else:
+                delivered.append(recipient_id)
+
+        deliveries = AnnouncementDelivery.objects.filter(announcement=announcement)
+        if delivered:
+            deliveries.filter(recipient_id__in=delivered).update(
+                status='sent', error='', sent_at=timezone.now(), attempts=F('attempts') + 1,
+            )
+        for error, failed_ids in errors.items():
+            deliveries.filter(recipient_id__in=failed_ids).update(status='failed', error=error, attempts=F('attempts') + 1)
+        sent += len(delivered)
+        failed += len(chunk) - len(delivered)
+        renew_lease(job)
+
+    job.status = 'failed' if failed else 'done'
+    job.last_error = last_error
+    job.processed_at = timezone.now()
+    job.locked_at = None
+    job.save(update_fields=['status', 'last_error', 'processed_at', 'locked_at'])
+    return sent, failed
@@ -1,5 +1,6 @@
 from rest_framework import permissions
 from courses.models import Course
+from .policies import ASSIGNMENT_POLICY, ASSIGNMENT_SUBMISSION_POLICY, ANNOUNCEMENT_POLICY, SUBMISSION_POLICY
 from rest_framework.exceptions import PermissionDenied
 
 class AssignmentPermission(permissions.BasePermission):
@@ -20,10 +21,10 @@ class AssignmentPermission(permissions.BasePermission):
             return True
         
         if request.user.role == 'teacher':
-            return obj.course in request.user.courses_taught.all()
+            return ASSIGNMENT_POLICY.allows(request.user, obj)
 
         if request.user.role == 'student' and view.action == 'retrieve':
-            return obj.course in request.user.enrolled_courses.all()
+            return ASSIGNMENT_POLICY.allows(request.user, obj)
 
         return False
     
@@ -39,7 +40,7 @@ class AssignmentSubmissionPermission(permissions.BasePermission):
         
         # Allow teachers and admins to view and manage submissions
         if request.user.role == 'teacher':
-            return obj.assignment.course in request.user.courses_taught.all()
+            return ASSIGNMENT_SUBMISSION_POLICY.allows(request.user, obj)
         
         return request.user.role == 'admin'
 
@@ -60,15 +61,15 @@ class AnnouncementPermission(permissions.BasePermission):
         if request.user.role == 'admin':
             return True
         if request.user.role == 'teacher':
-            return obj.course in request.user.courses_taught.all()
+            return ANNOUNCEMENT_POLICY.allows(request.user, obj)
         if request.user.role == 'student' and view.action == 'retrieve':
-            return obj.course in request.user.enrolled_courses.all()
+            return ANNOUNCEMENT_POLICY.allows(request.user, obj)
         return False
     
 class QuizPermission(permissions.BasePermission):
     """
     Custom permission to allow only admins and teachers to create, update, and delete quizzes.
-    Students can only view quizzes.
+    Students can only view quizzes and start attempts at them.
     """
 
     def has_permission(self, request, view):
@@ -77,7 +78,7 @@ class QuizPermission(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.user.role in ['admin', 'teacher']:
             return True
-        if request.user.role == 'student' and view.action in ['retrieve', 'list']:
+        if request.user.role == 'student' and view.action in ['retrieve', 'list', 'start']:
             return True
         return False
 
@@ -103,7 +104,8 @@ class QuestionPermission(permissions.BasePermission):
 class SubmissionPermission(permissions.BasePermission):
     """
     Custom permission to allow:
-    - Admins and teachers: Full access (view, create, update, delete)
+    - Admins: Full access (view, create, update, delete)
+    - Teachers: Full access to the submissions of the courses they teach
     - Students: Can only submit (POST) once for a specific quiz, and view (GET) their own submissions.
     """
 
@@ -119,7 +121,7 @@ class SubmissionPermission(permissions.BasePermission):
 
     def has_object_permission(self, request, view, obj):
         if request.user.role in ['admin', 'teacher']:
-            return True
+            return SUBMISSION_POLICY.allows(request.user, obj)
         if request.user.role == 'student':
             if view.action in ['retrieve', 'list']:
                 return obj.student == request.user
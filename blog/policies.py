@@ -0,0 +1,33 @@
+from courses.policies import AccessPolicy, EVERYTHING, InCourse, OwnedBy
+
+
+def course_policy(path):
+    """Admins see everything; teachers and students the rows of their own courses."""
+    return AccessPolicy(
+        admin=EVERYTHING,
+        teacher=InCourse(path, 'taught'),
+        student=InCourse(path, 'enrolled'),
+    )
+
+
+def student_work_policy(course_path, student_path='student'):
+    """Admins see everything, teachers the work handed in for their courses, students their own."""
+    return AccessPolicy(
+        admin=EVERYTHING,
+        teacher=InCourse(course_path, 'taught'),
+        student=OwnedBy(student_path),
+    )
+
+
+ASSIGNMENT_POLICY = course_policy('course')
+ANNOUNCEMENT_POLICY = course_policy('course')
+QUIZ_POLICY = course_policy('course')
+QUESTION_POLICY = course_policy('quiz__course')
+DISCUSSION_THREAD_POLICY = course_policy('course')
+DISCUSSION_POST_POLICY = course_policy('thread__course')
+DISCUSSION_REPLY_POLICY = course_policy('post__thread__course')
+
+ASSIGNMENT_SUBMISSION_POLICY = student_work_policy('assignment__course')
+ASSIGNMENT_UPLOAD_POLICY = student_work_policy('assignment__course')
+SUBMISSION_POLICY = student_work_policy('quiz__course')
+QUIZ_ATTEMPT_POLICY = student_work_policy('quiz__course')
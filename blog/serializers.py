@@ -1,5 +1,15 @@
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.text import get_valid_filename
 from rest_framework import serializers
-from .models import Assignment,AssignmentSubmission, Announcement, Quiz, Question, Submission, DiscussionThread, DiscussionPost, DiscussionReply
+from .models import Assignment,AssignmentSubmission, AssignmentUpload, Announcement, Quiz, Question, Submission, QuizAttempt, DiscussionThread, DiscussionPost, DiscussionReply
+from .grading import bump_questions_version, draw_questions
+from courses.membership import course_membership
 
 
 
@@ -18,7 +28,32 @@ class AssignmentSubmissionSerializer(serializers.ModelSerializer):
         # Ensure that the student is enrolled in the course of the assignment
         student = data['student']
         assignment = data['assignment']
-        if assignment.course not in student.enrolled_courses.all():
+        if not course_membership(student).enrolled_in(assignment.course_id):
+            raise serializers.ValidationError("You are not enrolled in the course for this assignment.")
+        return data
+
+class AssignmentUploadSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AssignmentUpload
+        fields = ['id', 'student', 'assignment', 'filename', 'size', 'chunk_size', 'received', 'status', 'created_at', 'updated_at', 'submission']
+        read_only_fields = ['student', 'chunk_size', 'received', 'status', 'created_at', 'updated_at', 'submission']
+
+    def validate_filename(self, value):
+        filename = get_valid_filename(os.path.basename(value))
+        if not filename:
+            raise serializers.ValidationError("Invalid file name.")
+        return filename
+
+    def validate_size(self, value):
+        if value <= 0:
+            raise serializers.ValidationError("The file is empty.")
+        if value > settings.ASSIGNMENT_UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(f"Files may be at most {settings.ASSIGNMENT_UPLOAD_MAX_SIZE} bytes.")
+        return value
+
+    def validate(self, data):
+        student = self.context['request'].user
+        if not course_membership(student).enrolled_in(data['assignment'].course_id):
             raise serializers.ValidationError("You are not enrolled in the course for this assignment.")
         return data
 
@@ -38,39 +73,135 @@ class StudentQuestionSerializer(serializers.ModelSerializer):
         fields = ['id', 'quiz', 'text', 'question_type', 'options']
 
 
+QUESTION_PAYLOAD_TIMEOUT = 60 * 60
+_invalidation_suppressed = ContextVar('quiz_invalidation_suppressed', default=False)
+
+
+def question_payload_cache_key(quiz, view):
+    return f'blog:quiz_questions:{quiz.id}:{quiz.questions_version}:{view}'
+
+
+def invalidate_quiz_caches(quiz_id):
+    """
+    Retire everything cached from a quiz's questions, the answer key and the
+    serialized payloads, by bumping the version their cache keys carry.
+    """
+    if not _invalidation_suppressed.get():
+        bump_questions_version(quiz_id)
+
+
+@contextmanager
+def quiz_invalidation_suppressed():
+    """Skip the per-question invalidation inside the block; the caller bumps the version once itself."""
+    token = _invalidation_suppressed.set(True)
+    try:
+        yield
+    finally:
+        _invalidation_suppressed.reset(token)
+
+
+class QuizQuestionInputSerializer(serializers.ModelSerializer):
+    """Validates the nested `questions` list written through QuizSerializer."""
+    id = serializers.IntegerField(required=False)
+
+    class Meta:
+        model = Question
+        fields = ['id', 'text', 'question_type', 'correct_answer', 'options']
+
+
 class QuizSerializer(serializers.ModelSerializer):
     questions = serializers.SerializerMethodField()
 
     class Meta:
         model = Quiz
-        fields = ['id', 'title', 'description', 'course', 'due_date', 'time_limit', 'questions']
+        fields = ['id', 'title', 'description', 'course', 'due_date', 'time_limit', 'questions_per_student', 'questions']
+
+    def to_internal_value(self, data):
+        validated_data = super().to_internal_value(data)
+        if 'questions' in data:
+            questions = QuizQuestionInputSerializer(data=data['questions'], many=True)
+            if not questions.is_valid():
+                raise serializers.ValidationError({'questions': questions.errors})
+            validated_data['questions'] = questions.validated_data
+        return validated_data
 
     def create(self, validated_data):
         questions_data = validated_data.pop('questions', [])
-        quiz = Quiz.objects.create(**validated_data)
-        for question_data in questions_data:
-            Question.objects.create(quiz=quiz, **question_data)
+        with transaction.atomic():
+            quiz = Quiz.objects.create(**validated_data)
+            Question.objects.bulk_create([
+                Question(quiz=quiz, **{field: value for field, value in question_data.items() if field != 'id'})
+                for question_data in questions_data
+            ])
         return quiz
 
     def update(self, instance, validated_data):
         questions_data = validated_data.pop('questions', None)
-        instance = super().update(instance, validated_data)
-        if questions_data:
-            instance.questions.all().delete() 
-            for question_data in questions_data:
-                Question.objects.create(quiz=instance, **question_data)
+        with transaction.atomic():
+            instance = super().update(instance, validated_data)
+            if questions_data is not None:
+                self.upsert_questions(instance, questions_data)
         return instance
 
+    def upsert_questions(self, quiz, questions_data):
+        """
+        Make the quiz's questions match `questions_data`: items with an `id` update that
+        question in place, items without one are created, and questions left out are
+        deleted. IDs of untouched questions stay stable, so `Submission.answers` keys
+        keep pointing at the right rows.
+        """
+        existing = {question.id: question for question in Question.objects.filter(quiz=quiz)}
+        to_create, to_update, seen = [], [], set()
+        for question_data in questions_data:
+            question_data = dict(question_data)
+            question_id = question_data.pop('id', None)
+            if question_id is None:
+                to_create.append(Question(quiz=quiz, **question_data))
+                continue
+            question = existing.get(question_id)
+            if question is None or question_id in seen:
+                raise serializers.ValidationError({'questions': [f"Question {question_id} is not part of this quiz or is listed twice."]})
+            seen.add(question_id)
+            if any(getattr(question, field) != value for field, value in question_data.items()):
+                for field, value in question_data.items():
+                    setattr(question, field, value)
+                to_update.append(question)
+
+        removed_ids = existing.keys() - seen
+        if removed_ids:
+            # post_delete would bump the version once per row; it is bumped once below.
+            with quiz_invalidation_suppressed():
+                Question.objects.filter(id__in=removed_ids).delete()
+        if to_update:
+            Question.objects.bulk_update(to_update, ['text', 'question_type', 'correct_answer', 'options'])
+        if to_create:
+            Question.objects.bulk_create(to_create)
+        if removed_ids or to_update or to_create:
+            # bulk_create/bulk_update skip the Question signals, and the deletes were batched; one bump covers them all.
+            def retire_cached_questions():
+                invalidate_quiz_caches(quiz.id)
+                # The response is serialized from this instance; don't let it read the old version.
+                quiz.refresh_from_db(fields=['questions_version'])
+            transaction.on_commit(retire_cached_questions)
+
     def get_questions(self, obj):
+        """
+        Serialized questions, cached per quiz and per role view. Students get the
+        payload without `correct_answer`, limited to their own draw when the quiz
+        serves a random subset. Entries are dropped when a question changes.
+        """
         user = self.context['request'].user
-        if user.role == 'student':
-            return StudentQuestionSerializer(obj.questions.all(), many=True).data
-        return QuestionSerializer(obj.questions.all(), many=True).data
-
-    def to_representation(self, instance):
-        representation = super().to_representation(instance)
-        representation['questions'] = self.get_questions(instance)
-        return representation
+        view = 'student' if user.role == 'student' else 'staff'
+        key = question_payload_cache_key(obj, view)
+        payload = cache.get(key)
+        if payload is None:
+            serializer_class = StudentQuestionSerializer if view == 'student' else QuestionSerializer
+            payload = [dict(item) for item in serializer_class(obj.questions.all(), many=True).data]
+            cache.set(key, payload, QUESTION_PAYLOAD_TIMEOUT)
+        if view == 'student' and obj.questions_per_student:
+            drawn = set(draw_questions(obj, user.id))
+            payload = [item for item in payload if str(item['id']) in drawn]
+        return payload
 
 
 class SubmissionSerializer(serializers.ModelSerializer):
@@ -78,6 +209,12 @@ class SubmissionSerializer(serializers.ModelSerializer):
         model = Submission
         fields = '__all__'
 
+class QuizAttemptSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = QuizAttempt
+        fields = ['id', 'quiz', 'student', 'started_at', 'deadline', 'finalized_at', 'submission']
+        read_only_fields = fields
+
 class DiscussionThreadSerializer(serializers.ModelSerializer):
     class Meta:
         model = DiscussionThread
@@ -0,0 +1,75 @@
+from django.db.models import QuerySet
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from django_project.tasks import defer
+from courses.models import Course
+from resources.storage import release_replaced_file, release_deleted_file
+from .models import AssignmentSubmission, Quiz, Question, Submission
+from .serializers import invalidate_quiz_caches
+from .analytics import bump_scores_version, record_submission
+from .similarity import fingerprint_submission
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def on_question_changed(sender, instance, **kwargs):
+    invalidate_quiz_caches(instance.quiz_id)
+
+
+@receiver(pre_save, sender=Submission)
+def remember_graded_submission(sender, instance, **kwargs):
+    # An edited submission is swapped out of the item statistics after it is saved.
+    instance._previous_grading = None
+    if instance.pk is not None:
+        instance._previous_grading = Submission.objects.filter(pk=instance.pk).values_list(
+            'quiz_id', 'student_id', 'answers', 'score', 'question_ids',
+        ).first()
+
+
+@receiver(post_save, sender=Submission)
+def add_submission_to_item_statistics(sender, instance, created, **kwargs):
+    bump_scores_version(instance.quiz_id)
+    current = (instance.quiz_id, instance.student_id, instance.answers, instance.score, instance.question_ids)
+    previous = getattr(instance, '_previous_grading', None)
+    if not created:
+        if previous is None or previous == current:
+            return
+        quiz_id, student_id, answers, score, question_ids = previous
+        if quiz_id != instance.quiz_id:
+            bump_scores_version(quiz_id)
+        defer(record_submission, quiz_id, student_id, answers, score, weight=-1, question_ids=question_ids)
+    defer(
+        record_submission, instance.quiz_id, instance.student_id, instance.answers, instance.score,
+        question_ids=instance.question_ids,
+    )
+
+
+@receiver(post_delete, sender=Submission)
+def remove_submission_from_item_statistics(sender, instance, origin=None, **kwargs):
+    # When the whole quiz or course is being deleted its statistics go with it.
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if origin_model in (Quiz, Course):
+        return
+    bump_scores_version(instance.quiz_id)
+    defer(
+        record_submission, instance.quiz_id, instance.student_id, instance.answers, instance.score,
+        weight=-1, question_ids=instance.question_ids,
+    )
+
+
+@receiver(post_save, sender=AssignmentSubmission)
+def fingerprint_assignment_submission(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and 'file' not in update_fields:
+        return
+    if instance.file:
+        defer(fingerprint_submission, instance.pk)
+
+
+@receiver(pre_save, sender=AssignmentSubmission)
+def release_replaced_submission_file(sender, instance, **kwargs):
+    release_replaced_file(instance, 'file')
+
+
+@receiver(post_delete, sender=AssignmentSubmission)
+def release_submission_file(sender, instance, **kwargs):
+    release_deleted_file(instance, 'file')
@@ -0,0 +1,178 @@
+import hashlib
+import re
+import zlib
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from django_project.extraction import UnsupportedFormat, extract_text
+from .models import Assignment, AssignmentSubmission, SimilarSubmissionPair, SubmissionBucket, SubmissionFingerprint
+
+NUM_PERMUTATIONS = 128
+# 32 bands of 4 rows: pairs with a Jaccard similarity of roughly 0.4 and up land in a
+# shared bucket with high probability; the threshold is then checked on the signatures.
+LSH_BANDS = 32
+SHINGLE_SIZE = 5
+HASH_BLOCK_SIZE = 4096
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+# Fixed seed: stored signatures are only comparable if every process uses the same permutations.
+_random = np.random.RandomState(20240917)
+_PERMUTATION_A = _random.randint(1, 1 << 32, size=NUM_PERMUTATIONS, dtype=np.uint64)
+_PERMUTATION_B = _random.randint(0, 1 << 32, size=NUM_PERMUTATIONS, dtype=np.uint64)
+
+WORD = re.compile(r'\w+')
+
+
+def shingle_hashes(text):
+    """32-bit hashes of the distinct word 5-grams in `text`."""
+    words = WORD.findall(text.lower())
+    if not words:
+        return np.empty(0, dtype=np.uint64)
+    shingles = {
+        zlib.crc32(' '.join(words[start:start + SHINGLE_SIZE]).encode())
+        for start in range(max(len(words) - SHINGLE_SIZE + 1, 1))
+    }
+    return np.fromiter(shingles, dtype=np.uint64, count=len(shingles))
+
+
+def minhash_signature(hashes):
+    """
+    MinHash signature of a set of 32-bit hashes. Both factors of `a * x` are below
+    2**32, so the permutations never overflow uint64. Hashes are processed in blocks
+    to keep the intermediate matrix small.
+    """
+    signature = np.full(NUM_PERMUTATIONS, _MAX_HASH, dtype=np.uint64)
+    for start in range(0, hashes.size, HASH_BLOCK_SIZE):
+        block = hashes[start:start + HASH_BLOCK_SIZE, np.newaxis]
+        permuted = (block * _PERMUTATION_A + _PERMUTATION_B) % _MERSENNE_PRIME & _MAX_HASH
+        np.minimum(signature, permuted.min(axis=0), out=signature)
+    return signature.astype(np.uint32)
+
+
+def band_buckets(signature):
+    rows = NUM_PERMUTATIONS // LSH_BANDS
+    return [
+        int.from_bytes(hashlib.blake2b(signature[band * rows:(band + 1) * rows].tobytes(), digest_size=8).digest(), 'big', signed=True)
+        for band in range(LSH_BANDS)
+    ]
+
+
+def estimate_similarity(signature, other):
+    """Estimated Jaccard similarity: the share of permutations whose minimums agree."""
+    return float(np.mean(signature == other))
+
+
+def _signature_of(submission):
+    """(status, error, signature, shingle count) for the submission's current file."""
+    try:
+        with submission.file.open('rb') as fileobj:
+            text = extract_text(fileobj, submission.file.name)
+    except UnsupportedFormat as e:
+        return 'unsupported', str(e), None, 0
+    except Exception as e:
+        return 'failed', str(e), None, 0
+    hashes = shingle_hashes(text)
+    if hashes.size == 0:
+        return 'empty', '', None, 0
+    return 'ok', '', minhash_signature(hashes), hashes.size
+
+
+def fingerprint_submission(submission_id):
+    """
+    (Re)compute a submission's MinHash signature and LSH buckets, then compare it
+    with the other submissions that share a bucket. Only those candidates are
+    compared, so each new submission costs about the same whatever the class size.
+    """
+    submission = AssignmentSubmission.objects.filter(pk=submission_id).only('id', 'assignment_id', 'file').first()
+    if submission is None:
+        return None
+    if not submission.file:
+        SubmissionFingerprint.objects.filter(submission_id=submission_id).delete()
+        SimilarSubmissionPair.objects.filter(Q(first_id=submission_id) | Q(second_id=submission_id)).delete()
+        return None
+
+    # Text extraction is the slow part; keep it outside the transaction.
+    status, error, signature, shingles = _signature_of(submission)
+    threshold = settings.SUBMISSION_SIMILARITY_THRESHOLD
+
+    with transaction.atomic():
+        # Fingerprint one submission per assignment at a time so two arriving together still meet.
+        Assignment.objects.select_for_update().filter(pk=submission.assignment_id).first()
+        fingerprint, _ = SubmissionFingerprint.objects.update_or_create(
+            submission=submission,
+            defaults={
+                'assignment_id': submission.assignment_id,
+                'file_name': submission.file.name,
+                'signature': signature.tobytes() if signature is not None else None,
+                'shingles': shingles,
+                'status': status,
+                'error': error,
+            },
+        )
+        fingerprint.buckets.all().delete()
+        SimilarSubmissionPair.objects.filter(Q(first=submission) | Q(second=submission)).delete()
+        if signature is None:
+            return fingerprint
+
+        buckets = band_buckets(signature)
+        SubmissionBucket.objects.bulk_create([
+            SubmissionBucket(fingerprint=fingerprint, assignment_id=submission.assignment_id, band=band, bucket=bucket)
+            for band, bucket in enumerate(buckets)
+        ])
+        shared = Q()
+        for band, bucket in enumerate(buckets):
+            shared |= Q(band=band, bucket=bucket)
+        candidate_ids = (
+            SubmissionBucket.objects.filter(shared, assignment_id=submission.assignment_id)
+            .exclude(fingerprint=fingerprint)
+            .values('fingerprint_id')
+        )
+        pairs = []
+        candidates = SubmissionFingerprint.objects.filter(pk__in=candidate_ids).values_list('submission_id', 'signature')
+        for other_id, other_signature in candidates:
+            similarity = estimate_similarity(signature, np.frombuffer(other_signature, dtype=np.uint32))
+            if similarity >= threshold:
+                first_id, second_id = sorted((submission.id, other_id))
+                pairs.append(SimilarSubmissionPair(
+                    assignment_id=submission.assignment_id, first_id=first_id, second_id=second_id, similarity=similarity,
+                ))
+        SimilarSubmissionPair.objects.bulk_create(pairs)
+    return fingerprint
+
+
+def fingerprint_assignment(assignment_id):
+    """Fingerprint every submitted file of an assignment, e.g. to backfill or after changing the threshold."""
+    submission_ids = list(
+        AssignmentSubmission.objects.filter(assignment_id=assignment_id)
+        .exclude(file='').exclude(file=None)
+        .order_by('id').values_list('id', flat=True)
+    )
+    for submission_id in submission_ids:
+        fingerprint_submission(submission_id)
+    return len(submission_ids)
+
+
+def similarity_report(assignment, min_similarity=None):
+    """Suspected near-duplicate pairs for an assignment, most similar first."""
+    pairs = SimilarSubmissionPair.objects.filter(assignment=assignment)
+    if min_similarity is not None:
+        pairs = pairs.filter(similarity__gte=min_similarity)
+    pairs = pairs.select_related('first__student', 'second__student').order_by('-similarity', 'first_id', 'second_id')
+    with_files = AssignmentSubmission.objects.filter(assignment=assignment).exclude(file='').exclude(file=None)
+    return {
+        'threshold': settings.SUBMISSION_SIMILARITY_THRESHOLD,
+        'fingerprinted': SubmissionFingerprint.objects.filter(assignment=assignment, status='ok').count(),
+        'pending': with_files.filter(fingerprint__isnull=True).count(),
+        'pairs': [
+            {
+                'first': {'submission': pair.first_id, 'student': pair.first.student.username},
+                'second': {'submission': pair.second_id, 'student': pair.second.student.username},
+                'similarity': round(pair.similarity, 4),
+            }
+            for pair in pairs
+        ],
+    }
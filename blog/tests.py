@@ -1,3 +1,101 @@
+from datetime import timedelta
+
+from django.core.cache import cache
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from courses.models import Course
+from users.models import CustomUser
+from .attempts import collect_answers, finalize_expired_attempts
+from .models import Question, Quiz, QuizAttempt, Submission
+
+
+class QuizAttemptTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.student = CustomUser.objects.create_user('student', password='pw', role='student')
+        course = Course.objects.create(name='Algebra', description='')
+        course.students.add(self.student)
+        self.quiz = Quiz.objects.create(
+            title='Quiz 1', description='', course=course,
+            due_date=timezone.now() + timedelta(days=1), time_limit=10,
+        )
+        self.questions = [
+            Question.objects.create(quiz=self.quiz, text=f'Q{i}', question_type='true_false', correct_answer='True')
+            for i in range(3)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def start(self):
+        return self.client.post(f'/api/quizzes/{self.quiz.pk}/start/')
+
+    def autosave(self, attempt_id, answers):
+        return self.client.post(f'/api/quiz-attempts/{attempt_id}/autosave/', {'answers': answers}, format='json')
+
+    def submit(self, answers):
+        return self.client.post(
+            '/api/submissions/', {'quiz': self.quiz.pk, 'student': self.student.pk, 'answers': answers}, format='json',
+        )
+
+    def expire(self):
+        QuizAttempt.objects.filter(quiz=self.quiz).update(deadline=timezone.now() - timedelta(minutes=5))
+
+    def test_start_creates_once_then_resumes(self):
+        first = self.start()
+        self.assertEqual(first.status_code, 201)
+        resumed = self.start()
+        self.assertEqual(resumed.status_code, 200)
+        self.assertEqual(resumed.data['id'], first.data['id'])
+
+    def test_autosave_replays_latest_answer_per_question(self):
+        attempt_id = self.start().data['id']
+        first, second, third = (str(question.pk) for question in self.questions)
+        self.autosave(attempt_id, {first: 'False', second: 'True'})
+        self.autosave(attempt_id, {first: 'True', third: 'True'})
+        self.autosave(attempt_id, {third: None})
+        self.assertEqual(collect_answers(QuizAttempt.objects.get(pk=attempt_id)), {first: 'True', second: 'True'})
+
+    def test_autosave_rejects_unknown_questions(self):
+        attempt_id = self.start().data['id']
+        self.assertEqual(self.autosave(attempt_id, {'999999': 'True'}).status_code, 400)
+
+    def test_submission_requires_an_attempt(self):
+        self.assertEqual(self.submit({}).status_code, 403)
+        self.assertFalse(Submission.objects.exists())
+
+    def test_submission_is_graded_through_the_attempt(self):
+        self.start()
+        response = self.submit({str(question.pk): 'True' for question in self.questions[:2]})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['score'], 2)
+        self.assertIsNotNone(QuizAttempt.objects.get().finalized_at)
+
+    def test_deadline_is_enforced(self):
+        attempt_id = self.start().data['id']
+        self.autosave(attempt_id, {str(self.questions[0].pk): 'True'})
+        self.expire()
+        self.assertEqual(self.autosave(attempt_id, {str(self.questions[1].pk): 'True'}).status_code, 403)
+        response = self.submit({str(question.pk): 'True' for question in self.questions})
+        self.assertEqual(response.status_code, 403)
+        # Only what was autosaved before the deadline counts.
+        self.assertEqual(Submission.objects.get().score, 1)
+
+    def test_resubmission_is_rejected(self):
+        self.start()
+        self.assertEqual(self.submit({}).status_code, 201)
+        self.assertEqual(self.submit({str(self.questions[0].pk): 'True'}).status_code, 403)
+        self.assertEqual(self.start().status_code, 200)
+        self.assertEqual(Submission.objects.count(), 1)
 
-# Create your tests here.
+    def test_finalize_expired_attempts(self):
+        attempt_id = self.start().data['id']
+        self.autosave(attempt_id, {str(question.pk): 'True' for question in self.questions})
+        self.assertEqual(finalize_expired_attempts(), 0)
+        self.expire()
+        self.assertEqual(finalize_expired_attempts(), 1)
+        self.assertEqual(finalize_expired_attempts(), 0)
+        attempt = QuizAttempt.objects.select_related('submission').get(pk=attempt_id)
+        self.assertIsNotNone(attempt.finalized_at)
+        self.assertEqual(attempt.submission.score, 3)
@@ -0,0 +1,123 @@
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from .models import AssignmentSubmission, AssignmentUpload
+
+# Bytes read from the request per write, so memory stays flat however large a chunk is.
+COPY_BUFFER_SIZE = 64 * 1024
+
+
+class SpooledUploadFile(File):
+    """
+    A finished spool file. Exposing `temporary_file_path` lets the file system
+    storages move it into place instead of copying it; other storages stream it in
+    chunks.
+    """
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def spool_path(upload):
+    return os.path.join(settings.ASSIGNMENT_UPLOAD_DIR, f'{upload.pk}.part')
+
+
+def remove_spool(upload):
+    try:
+        os.remove(spool_path(upload))
+    except FileNotFoundError:
+        pass
+
+
+def open_upload(student, assignment, filename, size):
+    """Create an upload session and its empty spool file."""
+    upload = AssignmentUpload.objects.create(
+        student=student,
+        assignment=assignment,
+        filename=filename,
+        size=size,
+        chunk_size=settings.ASSIGNMENT_UPLOAD_CHUNK_SIZE,
+    )
+    os.makedirs(settings.ASSIGNMENT_UPLOAD_DIR, exist_ok=True)
+    open(spool_path(upload), 'wb').close()
+    return upload
+
+
+def write_chunk(upload, offset, length, stream):
+    """
+    Copy one chunk from `stream` into the spool file at `offset` and advance the
+    upload. Chunks start on a `chunk_size` boundary no later than what has been
+    received, so a chunk lost to a network error can simply be sent again.
+    """
+    if upload.status != 'open':
+        raise ValidationError("This upload is already complete.")
+    if offset % upload.chunk_size or offset > upload.received:
+        raise ValidationError(f"Expected a chunk starting at byte {upload.received}.")
+    end = offset + length
+    if end > upload.size or (length != upload.chunk_size and end != upload.size):
+        raise ValidationError(f"Chunks must be {upload.chunk_size} bytes; only the last one may be shorter.")
+
+    with open(spool_path(upload), 'r+b') as spool:
+        spool.seek(offset)
+        remaining = length
+        while remaining:
+            data = stream.read(min(COPY_BUFFER_SIZE, remaining))
+            if not data:
+                raise ValidationError(f"Chunk ended after {length - remaining} of {length} bytes.")
+            spool.write(data)
+            remaining -= len(data)
+
+    # The row is only locked for this UPDATE, not while the chunk is on the wire.
+    advanced = AssignmentUpload.objects.filter(pk=upload.pk, status='open', received__gte=offset).update(
+        received=Greatest(F('received'), end), updated_at=timezone.now(),
+    )
+    if not advanced:
+        raise ValidationError("This upload changed while the chunk was being written; check its offset and retry.")
+    upload.refresh_from_db()
+    return upload
+
+
+def complete_upload(upload):
+    """Attach the spooled file to the student's submission. Safe to call more than once."""
+    with transaction.atomic():
+        upload = AssignmentUpload.objects.select_for_update().get(pk=upload.pk)
+        if upload.status == 'complete':
+            return upload
+        if upload.received != upload.size:
+            raise ValidationError(f"Only {upload.received} of {upload.size} bytes have been received.")
+
+        submission, _ = AssignmentSubmission.objects.get_or_create(student=upload.student, assignment=upload.assignment)
+        # The file is stored when the submission is saved; a replaced file is released by the pre_save signal.
+        with SpooledUploadFile(open(spool_path(upload), 'rb'), name=upload.filename) as spooled:
+            submission.file = spooled
+            submission.submitted_at = timezone.now()
+            submission.save()
+
+        upload.status = 'complete'
+        upload.submission = submission
+        upload.save(update_fields=['status', 'submission', 'updated_at'])
+    # Storages that copied rather than moved the spool file leave it behind.
+    remove_spool(upload)
+    return upload
+
+
+def abort_upload(upload):
+    remove_spool(upload)
+    upload.delete()
+
+
+def purge_stale_uploads(now=None):
+    """Drop open uploads that have not received a chunk within ASSIGNMENT_UPLOAD_EXPIRY_HOURS."""
+    cutoff = (now or timezone.now()) - timedelta(hours=settings.ASSIGNMENT_UPLOAD_EXPIRY_HOURS)
+    stale = list(AssignmentUpload.objects.filter(status='open', updated_at__lt=cutoff).only('pk'))
+    for upload in stale:
+        abort_upload(upload)
+    return len(stale)
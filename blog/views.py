@@ -1,23 +1,49 @@
-from rest_framework import viewsets, permissions
-from django.core.mail import send_mail
-from .models import Assignment,AssignmentSubmission, Announcement, Quiz, Question, Submission, DiscussionThread, DiscussionPost, DiscussionReply
-from .serializers import AssignmentSerializer,AssignmentSubmissionSerializer, AnnouncementSerializer, QuizSerializer, QuestionSerializer,StudentQuestionSerializer, SubmissionSerializer, DiscussionThreadSerializer, DiscussionPostSerializer, DiscussionReplySerializer
+import re
+
+from rest_framework import viewsets, permissions, status, mixins
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from .models import Assignment,AssignmentSubmission, AssignmentUpload, Announcement, Quiz, Question, Submission, QuizAttempt, DiscussionThread, DiscussionPost, DiscussionReply
+from .serializers import AssignmentSerializer,AssignmentSubmissionSerializer, AssignmentUploadSerializer, AnnouncementSerializer, QuizSerializer, QuestionSerializer,StudentQuestionSerializer, SubmissionSerializer, QuizAttemptSerializer, DiscussionThreadSerializer, DiscussionPostSerializer, DiscussionReplySerializer
 from users.models import CustomUser
 from courses.models import Course
+from courses.membership import course_membership
 from users.serializers import UserSerializer
 from courses.serializers import CourseSerializer
-from rest_framework.authentication import TokenAuthentication
+from accounts.authentication import ExpiringTokenAuthentication, SignedTokenAuthentication
 from rest_framework.permissions import IsAuthenticated
+from .policies import ASSIGNMENT_POLICY, ASSIGNMENT_SUBMISSION_POLICY, ASSIGNMENT_UPLOAD_POLICY, ANNOUNCEMENT_POLICY, QUIZ_POLICY, QUESTION_POLICY, SUBMISSION_POLICY, QUIZ_ATTEMPT_POLICY, DISCUSSION_THREAD_POLICY, DISCUSSION_POST_POLICY, DISCUSSION_REPLY_POLICY
 from .permissions import AssignmentPermission, AnnouncementPermission, QuizPermission, QuestionPermission, SubmissionPermission, DiscussionPermissions, AssignmentSubmissionPermission
 from rest_framework.exceptions import PermissionDenied
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
+from .notifications import enqueue_announcement
+from .grading import draw_questions, grade_submission, regrade_quiz
+from .importers import detect_format, import_question_bank
+from rest_framework.parsers import MultiPartParser
+from .analytics import bump_scores_version, item_analysis, rebuild_item_statistics, score_statistics
+from .attempts import start_attempt, autosave, collect_answers, finalize_attempt, attempt_expired, submit_attempt
+from .uploads import open_upload, write_chunk, complete_upload, abort_upload
+from .exports import iter_submissions_zip
+from .similarity import similarity_report
+from django.http import StreamingHttpResponse
+from django.utils.text import slugify
+
+CONTENT_RANGE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+
+
+def course_from_param(value):
+    """The course whose ID is `value` (a query or form parameter), or None if there is none."""
+    try:
+        return Course.objects.filter(id=int(value)).first()
+    except (TypeError, ValueError):
+        return None
 
 
 class AssignmentViewSet(viewsets.ModelViewSet):
     queryset = Assignment.objects.all()
     serializer_class = AssignmentSerializer
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [ExpiringTokenAuthentication, SignedTokenAuthentication]
     permission_classes = [IsAuthenticated, AssignmentPermission]
     
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -25,41 +51,106 @@ class AssignmentViewSet(viewsets.ModelViewSet):
     ordering_fields = ['due_date']
 
     def get_queryset(self):
-        user = self.request.user
-        if user.role == 'admin':
-            return Assignment.objects.all()
-        if user.role == 'teacher':
-            return Assignment.objects.filter(course__in=user.courses_taught.all())
-        if user.role == 'student':
-            return Assignment.objects.filter(course__in=user.enrolled_courses.all())
-
-        return Assignment.objects.none()
+        return ASSIGNMENT_POLICY.filter(Assignment.objects.all(), self.request.user)
+
+    @action(detail=True, methods=['get'])
+    def download_all(self, request, pk=None):
+        """Stream a ZIP of every submitted file, one `<username>/<file>` entry per student."""
+        assignment = self.get_object()
+        if request.user.role not in ['admin', 'teacher']:
+            raise PermissionDenied("Only teachers and admins can download all submissions.")
+        response = StreamingHttpResponse(
+            (part for part in iter_submissions_zip(assignment) if part),
+            content_type='application/zip',
+        )
+        filename = f"{slugify(assignment.title) or 'assignment'}-{assignment.pk}-submissions.zip"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    @action(detail=True, methods=['get'])
+    def similar_submissions(self, request, pk=None):
+        """Pairs of submissions flagged as near-duplicates; narrow with ?min_similarity=0.8."""
+        assignment = self.get_object()
+        if request.user.role not in ['admin', 'teacher']:
+            raise PermissionDenied("Only teachers and admins can screen submissions.")
+        min_similarity = request.query_params.get('min_similarity')
+        if min_similarity is not None:
+            try:
+                min_similarity = float(min_similarity)
+            except ValueError:
+                return Response({"error": "min_similarity must be a number."}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(similarity_report(assignment, min_similarity), status=status.HTTP_200_OK)
     
 class AssignmentSubmissionViewSet(viewsets.ModelViewSet):
     queryset = AssignmentSubmission.objects.all()
     serializer_class = AssignmentSubmissionSerializer
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [ExpiringTokenAuthentication, SignedTokenAuthentication]
     permission_classes = [IsAuthenticated, AssignmentSubmissionPermission]
 
     def get_queryset(self):
-        user = self.request.user
-        if user.role == 'admin':
-            return AssignmentSubmission.objects.all()
-        if user.role == 'teacher':
-            return AssignmentSubmission.objects.filter(assignment__course__in=user.courses_taught.all())
-        if user.role == 'student':
-            return AssignmentSubmission.objects.filter(student=user)
-        
-        return AssignmentSubmission.objects.none()
+        return ASSIGNMENT_SUBMISSION_POLICY.filter(AssignmentSubmission.objects.all(), self.request.user)
 
     def perform_create(self, serializer):
         serializer.save(student=self.request.user)
 
 
+class AssignmentUploadViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin, mixins.ListModelMixin,
+                              mixins.DestroyModelMixin, viewsets.GenericViewSet):
+    """
+    Resumable submission uploads. POST {"assignment", "filename", "size"} opens a
+    session, each chunk is PUT to `chunk/` as the raw request body with a
+    Content-Range header, and POST `complete/` attaches the file. GET a session to
+    find the offset to resume from.
+    """
+    queryset = AssignmentUpload.objects.all()
+    serializer_class = AssignmentUploadSerializer
+    authentication_classes = [ExpiringTokenAuthentication, SignedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return ASSIGNMENT_UPLOAD_POLICY.filter(AssignmentUpload.objects.all(), self.request.user)
+
+    def get_own_upload(self):
+        upload = self.get_object()
+        if upload.student_id != self.request.user.id:
+            raise PermissionDenied("You can only change your own uploads.")
+        return upload
+
+    def perform_create(self, serializer):
+        if self.request.user.role != 'student':
+            raise PermissionDenied("Only students can upload submissions.")
+        data = serializer.validated_data
+        serializer.instance = open_upload(self.request.user, data['assignment'], data['filename'], data['size'])
+
+    def perform_destroy(self, instance):
+        if instance.student_id != self.request.user.id:
+            raise PermissionDenied("You can only cancel your own uploads.")
+        abort_upload(instance)
+
+    @action(detail=True, methods=['put'])
+    def chunk(self, request, pk=None):
+        """Store one chunk; the body is read from the socket in small buffers rather than parsed."""
+        upload = self.get_own_upload()
+        match = CONTENT_RANGE.match(request.headers.get('Content-Range', ''))
+        if not match:
+            return Response({"error": "A 'Content-Range: bytes start-end/size' header is required."}, status=status.HTTP_400_BAD_REQUEST)
+        start, end, size = map(int, match.groups())
+        length = end - start + 1
+        if size != upload.size or length <= 0 or int(request.META.get('CONTENT_LENGTH') or 0) != length:
+            return Response({"error": "Content-Range does not match the upload or the request body."}, status=status.HTTP_400_BAD_REQUEST)
+        upload = write_chunk(upload, start, length, request.stream)
+        return Response(self.get_serializer(upload).data, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=['post'])
+    def complete(self, request, pk=None):
+        upload = complete_upload(self.get_own_upload())
+        return Response(self.get_serializer(upload).data, status=status.HTTP_200_OK)
+
+
 class AnnouncementViewSet(viewsets.ModelViewSet):
     queryset = Announcement.objects.all()
     serializer_class = AnnouncementSerializer
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [ExpiringTokenAuthentication, SignedTokenAuthentication]
     permission_classes = [IsAuthenticated, AnnouncementPermission]
     
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -67,36 +158,18 @@ class AnnouncementViewSet(viewsets.ModelViewSet):
     ordering_fields = ['course']
 
     def get_queryset(self):
-        user = self.request.user
-        if user.role == 'admin':
-            return Announcement.objects.all()
-        if user.role == 'teacher':
-            return Announcement.objects.filter(course__in=user.courses_taught.all())
-        if user.role == 'student':
-            return Announcement.objects.filter(course__in=user.enrolled_courses.all())
-        return Announcement.objects.none()
+        return ANNOUNCEMENT_POLICY.filter(Announcement.objects.all(), self.request.user)
 
     def perform_create(self, serializer):
         announcement = serializer.save()
-        students = announcement.course.students.all()
-        for student in students:
-            try:
-                send_mail(
-                    subject=f"New Announcement in {announcement.course.name}",
-                    message=announcement.message,
-                    from_email='no-reply@example.com',
-                    recipient_list=[student.email],
-                )
-            except Exception as e:
-                print(f"Failed to send email to {student.email}: {str(e)}")
-        if not students.exists():
-            print("No students are enrolled in the course.")
+        # Emails are sent by the `send_announcements` management command.
+        enqueue_announcement(announcement)
 
 
 class QuizViewSet(viewsets.ModelViewSet):
     queryset = Quiz.objects.all()
     serializer_class = QuizSerializer
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [ExpiringTokenAuthentication, SignedTokenAuthentication]
     permission_classes = [IsAuthenticated, QuizPermission]
     
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -104,14 +177,9 @@ class QuizViewSet(viewsets.ModelViewSet):
     ordering_fields = ['due_date']
 
     def get_queryset(self):
-        user = self.request.user
-        if user.role == 'admin':
-            return Quiz.objects.all()
-        if user.role == 'teacher':
-            return Quiz.objects.filter(course__in=user.courses_taught.all())
-        if user.role == 'student':
-            return Quiz.objects.filter(course__in=user.enrolled_courses.all())
-        return Quiz.objects.none()
+        quizzes = QUIZ_POLICY.filter(Quiz.objects.all(), self.request.user)
+        # Questions for the whole page come from one query (or the payload cache).
+        return quizzes.prefetch_related('questions')
 
     def perform_create(self, serializer):
         user = self.request.user
@@ -119,16 +187,86 @@ class QuizViewSet(viewsets.ModelViewSet):
             serializer.save()
         elif user.role == 'teacher':
             course = serializer.validated_data.get('course')
-            if course in user.courses_taught.all():
+            if course_membership(user).teaches(course.id):
                 serializer.save()
             else:
                 raise PermissionDenied("You can only create quizzes for the courses you teach.")
 
+    @action(detail=True, methods=['post'])
+    def regrade(self, request, pk=None):
+        """Re-score all submissions of this quiz after its answer key changed."""
+        if request.user.role not in ['admin', 'teacher']:
+            raise PermissionDenied("Only admins and teachers can regrade quizzes.")
+        quiz = self.get_object()
+        result = regrade_quiz(quiz.id)
+        rebuild_item_statistics(quiz.id)
+        bump_scores_version(quiz.id)
+        return Response(result, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=['get'])
+    def item_analysis(self, request, pk=None):
+        """Per-question difficulty, answer distribution and discrimination index."""
+        if request.user.role not in ['admin', 'teacher']:
+            raise PermissionDenied("Only admins and teachers can view item analysis.")
+        quiz = self.get_object()
+        return Response(item_analysis(quiz.id), status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=['get'])
+    def score_statistics(self, request, pk=None):
+        """Mean, median, spread, histogram and percentile ranks of this quiz's scores."""
+        if request.user.role not in ['admin', 'teacher']:
+            raise PermissionDenied("Only admins and teachers can view score statistics.")
+        quiz = self.get_object()
+        return Response(score_statistics('quiz', quiz.id), status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'])
+    def course_statistics(self, request):
+        """Distribution of percentage scores across every quiz of ?course=<id>."""
+        course = course_from_param(request.query_params.get('course'))
+        if course is None:
+            return Response({"detail": "A valid course is required."}, status=status.HTTP_400_BAD_REQUEST)
+        if request.user.role != 'admin' and not (
+            request.user.role == 'teacher' and course_membership(request.user).teaches(course.id)
+        ):
+            raise PermissionDenied("You can only view statistics for the courses you teach.")
+        return Response(score_statistics('course', course.id), status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def import_questions(self, request):
+        """Bulk-import quizzes and questions from an uploaded JSONL or CSV question bank."""
+        upload = request.FILES.get('file')
+        course = course_from_param(request.data.get('course'))
+        if upload is None or course is None:
+            return Response({"detail": "Both a file and a valid course are required."}, status=status.HTTP_400_BAD_REQUEST)
+        if request.user.role != 'admin' and not (
+            request.user.role == 'teacher' and course_membership(request.user).teaches(course.id)
+        ):
+            raise PermissionDenied("You can only import questions into the courses you teach.")
+        try:
+            fmt = detect_format(upload.name, request.data.get('format'))
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        report = import_question_bank(upload.file, course, fmt)
+        if 'detail' in report:
+            return Response(report, status=status.HTTP_400_BAD_REQUEST)
+        return Response(report, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=['post'])
+    def start(self, request, pk=None):
+        """Start a timed attempt; the server records the deadline and finalizes it when time is up."""
+        if request.user.role != 'student':
+            raise PermissionDenied("Only students can attempt quizzes.")
+        attempt, created = start_attempt(self.get_object(), request.user)
+        if attempt_expired(attempt):
+            attempt = finalize_attempt(attempt)
+        return Response(QuizAttemptSerializer(attempt).data, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
 
 
 class QuestionViewSet(viewsets.ModelViewSet):
     queryset = Question.objects.all()
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [ExpiringTokenAuthentication, SignedTokenAuthentication]
     permission_classes = [IsAuthenticated]
     
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -138,17 +276,13 @@ class QuestionViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         quiz_id = self.kwargs.get('quiz_pk')
         user = self.request.user
-        if user.role == 'admin':
-            return self.queryset.filter(quiz_id=quiz_id)
-        if user.role == 'teacher':
-            quiz = Quiz.objects.get(id=quiz_id)
-            if quiz.course in user.courses_taught.all():
-                return self.queryset.filter(quiz_id=quiz_id)
+        queryset = QUESTION_POLICY.filter(self.queryset.filter(quiz_id=quiz_id), user)
         if user.role == 'student':
-            quiz = Quiz.objects.get(id=quiz_id)
-            if quiz.course in user.enrolled_courses.all():
-                return self.queryset.filter(quiz_id=quiz_id)
-        return Question.objects.none()
+            # Students only see the questions drawn for them.
+            quiz = Quiz.objects.filter(id=quiz_id).only('id', 'questions_per_student', 'questions_version').first()
+            if quiz is not None and quiz.questions_per_student:
+                queryset = queryset.filter(id__in=[int(question_id) for question_id in draw_questions(quiz, user.id)])
+        return queryset
 
     def perform_create(self, serializer):
         user = self.request.user
@@ -156,7 +290,7 @@ class QuestionViewSet(viewsets.ModelViewSet):
         quiz = Quiz.objects.get(id=quiz_id)
         if user.role == 'admin':
             serializer.save()
-        elif user.role == 'teacher' and quiz.course in user.courses_taught.all():
+        elif user.role == 'teacher' and course_membership(user).teaches(quiz.course_id):
             serializer.save()
         else:
             raise PermissionDenied("You can only create questions for quizzes you are assigned to.")
@@ -168,7 +302,7 @@ class QuestionViewSet(viewsets.ModelViewSet):
 
         if user.role == 'admin':
             serializer.save()
-        elif user.role == 'teacher' and quiz.course in user.courses_taught.all():
+        elif user.role == 'teacher' and course_membership(user).teaches(quiz.course_id):
             serializer.save()
         else:
             raise PermissionDenied("You can only update questions for quizzes you are assigned to.")
@@ -183,7 +317,7 @@ class QuestionViewSet(viewsets.ModelViewSet):
 class SubmissionViewSet(viewsets.ModelViewSet):
     queryset = Submission.objects.all()
     serializer_class = SubmissionSerializer
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [ExpiringTokenAuthentication, SignedTokenAuthentication]
     permission_classes = [IsAuthenticated, SubmissionPermission]
     
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -191,22 +325,19 @@ class SubmissionViewSet(viewsets.ModelViewSet):
     ordering_fields = ['submitted_at']
 
     def get_queryset(self):
-        user = self.request.user
-        if user.role in ['admin', 'teacher']:
-            return Submission.objects.all()
-        if user.role == 'student':
-            return Submission.objects.filter(student=user)
-        return Submission.objects.none()
+        return SUBMISSION_POLICY.filter(Submission.objects.all(), self.request.user)
 
     def perform_create(self, serializer):
         user = self.request.user
         quiz = serializer.validated_data.get('quiz')
         if user.role == 'student':
-            if Submission.objects.filter(student=user, quiz=quiz).exists():
-                raise PermissionDenied("You have already submitted this quiz.")
+            # Students hand in through their timed attempt, which enforces the deadline.
+            serializer.instance = submit_attempt(quiz, user, serializer.validated_data.get('answers'))
+            return
 
-        submission = serializer.save(student=user)  
-        submission.calculate_score()
+        # Graded in memory against the cached answer key, then written once.
+        answers = serializer.validated_data.get('answers', {})
+        serializer.save(student=user, score=grade_submission(quiz, user.id, answers))
 
     def update(self, request, *args, **kwargs):
         if request.user.role == 'student':
@@ -218,12 +349,52 @@ class SubmissionViewSet(viewsets.ModelViewSet):
             raise PermissionDenied("You cannot delete your submission.")
         return super().destroy(request, *args, **kwargs)
 
+
+class QuizAttemptViewSet(viewsets.ReadOnlyModelViewSet):
+    queryset = QuizAttempt.objects.select_related('quiz')
+    serializer_class = QuizAttemptSerializer
+    authentication_classes = [ExpiringTokenAuthentication, SignedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ['quiz']
+    ordering_fields = ['started_at', 'deadline']
+
+    def get_queryset(self):
+        return QUIZ_ATTEMPT_POLICY.filter(self.queryset.all(), self.request.user)
+
+    def retrieve(self, request, *args, **kwargs):
+        attempt = self.get_object()
+        if attempt_expired(attempt):
+            attempt = finalize_attempt(attempt)
+        data = self.get_serializer(attempt).data
+        data['answers'] = collect_answers(attempt)
+        return Response(data)
+
+    @action(detail=True, methods=['post'])
+    def autosave(self, request, pk=None):
+        """Append answer changes, e.g. {"answers": {"12": "True"}}; only the deltas are written."""
+        attempt = self.get_object()
+        if attempt.student_id != request.user.id:
+            raise PermissionDenied("You can only save answers to your own attempt.")
+        saved = autosave(attempt, request.data.get('answers'))
+        return Response({'saved': saved, 'deadline': attempt.deadline}, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=['post'])
+    def finish(self, request, pk=None):
+        """Hand the attempt in early."""
+        attempt = self.get_object()
+        if attempt.student_id != request.user.id:
+            raise PermissionDenied("You can only hand in your own attempt.")
+        attempt = finalize_attempt(attempt)
+        return Response(self.get_serializer(attempt).data, status=status.HTTP_200_OK)
+
     
     
 class DiscussionThreadViewSet(viewsets.ModelViewSet):
     queryset = DiscussionThread.objects.all()
     serializer_class = DiscussionThreadSerializer
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [ExpiringTokenAuthentication, SignedTokenAuthentication]
     permission_classes = [IsAuthenticated, DiscussionPermissions]
     
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -231,12 +402,7 @@ class DiscussionThreadViewSet(viewsets.ModelViewSet):
     ordering_fields = ['created_at']
 
     def get_queryset(self):
-        user = self.request.user
-        if user.role == 'admin':
-            return DiscussionThread.objects.all()
-        if user.role in ['teacher', 'student']:
-            return DiscussionThread.objects.filter(course__in=user.courses_taught.all() if user.role == 'teacher' else user.enrolled_courses.all())  
-        return DiscussionThread.objects.none()
+        return DISCUSSION_THREAD_POLICY.filter(DiscussionThread.objects.all(), self.request.user)
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
@@ -245,7 +411,7 @@ class DiscussionThreadViewSet(viewsets.ModelViewSet):
 class DiscussionPostViewSet(viewsets.ModelViewSet):
     queryset = DiscussionPost.objects.all()
     serializer_class = DiscussionPostSerializer
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [ExpiringTokenAuthentication, SignedTokenAuthentication]
     permission_classes = [IsAuthenticated, DiscussionPermissions]
     
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -253,12 +419,7 @@ class DiscussionPostViewSet(viewsets.ModelViewSet):
     ordering_fields = ['created_at']
 
     def get_queryset(self):
-        user = self.request.user
-        if user.role == 'admin':
-            return DiscussionPost.objects.all()
-        if user.role in ['teacher', 'student']:
-            return DiscussionPost.objects.filter(thread__course__in=user.courses_taught.all() if user.role == 'teacher' else user.enrolled_courses.all())       
-        return DiscussionPost.objects.none()
+        return DISCUSSION_POST_POLICY.filter(DiscussionPost.objects.all(), self.request.user)
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
@@ -267,7 +428,7 @@ class DiscussionPostViewSet(viewsets.ModelViewSet):
 class DiscussionReplyViewSet(viewsets.ModelViewSet):
     queryset = DiscussionReply.objects.all()
     serializer_class = DiscussionReplySerializer
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [ExpiringTokenAuthentication, SignedTokenAuthentication]
     permission_classes = [IsAuthenticated, DiscussionPermissions]
     
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -276,12 +437,7 @@ class DiscussionReplyViewSet(viewsets.ModelViewSet):
 
 
     def get_queryset(self):
-        user = self.request.user
-        if user.role == 'admin':
-            return DiscussionReply.objects.all()
-        if user.role in ['teacher', 'student']:
-            return DiscussionReply.objects.filter(post__thread__course__in=user.courses_taught.all() if user.role == 'teacher' else user.enrolled_courses.all())
-        return DiscussionReply.objects.none()
+        return DISCUSSION_REPLY_POLICY.filter(DiscussionReply.objects.all(), self.request.user)
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
\ No newline at end of file
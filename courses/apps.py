@@ -7,5 +7,7 @@ class CoursesConfig(AppConfig):
     
     def ready(self):
         import courses.signals 
+        from .notifications import validate_broadcast_audience
+        validate_broadcast_audience()
     
     
@@ -0,0 +1,76 @@
+import statistics
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import Resolver404, resolve
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from courses.membership import forget_course_membership, membership_cache_key
+from users.models import CustomUser
+
+DEFAULT_ENDPOINTS = [
+    '/api/assignments/',
+    '/api/assignment-submissions/',
+    '/api/announcements/',
+    '/api/quizzes/',
+    '/api/quiz-attempts/',
+    '/api/discussion-threads/',
+    '/api/discussion-posts/',
+    '/api/discussion-replies/',
+    '/api/resources/',
+    '/api/users/',
+    '/api/profiles/',
+]
+
+
+class Command(BaseCommand):
+    help = "Measure the queries and latency of list endpoints for one user of each role."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', action='append', dest='usernames', default=[],
+                            help="Benchmark this user (repeatable). Defaults to the first user of each role.")
+        parser.add_argument('--endpoint', action='append', dest='endpoints', default=[],
+                            help="Path to request (repeatable). Defaults to the main list endpoints.")
+        parser.add_argument('--repeat', type=int, default=20, help="Requests per user and endpoint.")
+        parser.add_argument('--cold', action='store_true',
+                            help="Drop the cached course membership before every request.")
+
+    def handle(self, *args, **options):
+        if options['usernames']:
+            users = list(CustomUser.objects.filter(username__in=options['usernames']).order_by('role', 'username'))
+        else:
+            users = [user for user in (CustomUser.objects.filter(role=role).order_by('pk').first()
+                                       for role in ('admin', 'teacher', 'student')) if user]
+        if not users:
+            raise CommandError("No users to benchmark.")
+
+        factory = APIRequestFactory()
+        self.stdout.write(f"{'role':<8} {'user':<16} {'endpoint':<30} {'status':>6} {'queries':>7} {'median ms':>10} {'max ms':>8}")
+        for user in users:
+            for path in options['endpoints'] or DEFAULT_ENDPOINTS:
+                try:
+                    view = resolve(path).func
+                except Resolver404:
+                    raise CommandError(f"No view at {path}.")
+                timings, queries = [], 0
+                for _ in range(options['repeat']):
+                    # Every request starts from a fresh user object, as it would in production.
+                    forget_course_membership(user)
+                    if options['cold']:
+                        cache.delete(membership_cache_key(user.pk))
+                    request = factory.get(path, HTTP_HOST='localhost')
+                    force_authenticate(request, user=user)
+                    with CaptureQueriesContext(connection) as captured:
+                        started = time.perf_counter()
+                        response = view(request)
+                        response.render()
+                        timings.append((time.perf_counter() - started) * 1000)
+                    queries = len(captured)
+                self.stdout.write(
+                    f"{user.role:<8} {user.username[:16]:<16} {path:<30} {response.status_code:>6} {queries:>7} "
+                    f"{statistics.median(timings):>10.2f} {max(timings):>8.2f}"
+                )
+        self.stdout.write(self.style.SUCCESS("Benchmark finished."))
@@ -0,0 +1,160 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.db.models import Value
+
+from .models import Course
+
+# Attribute the membership is memoized under on the user instance. DRF
+# authenticates every request afresh, so it lives exactly as long as the request.
+CACHE_ATTRIBUTE = '_course_membership'
+
+_counter_lock = threading.Lock()
+_counters = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+
+class CourseMembership:
+    """IDs of the courses a user teaches and is enrolled in, for O(1) membership tests."""
+
+    def __init__(self, taught=(), enrolled=()):
+        self.taught = frozenset(taught)
+        self.enrolled = frozenset(enrolled)
+
+    def teaches(self, course_id):
+        return course_id in self.taught
+
+    def enrolled_in(self, course_id):
+        return course_id in self.enrolled
+
+    def course_ids(self, role):
+        """The courses a teacher or student works in; empty for any other role."""
+        if role == 'teacher':
+            return self.taught
+        if role == 'student':
+            return self.enrolled
+        return frozenset()
+
+
+def membership_cache_key(user_id):
+    return f'courses:membership:{user_id}'
+
+
+def membership_version_key(user_id):
+    return f'courses:membership_version:{user_id}'
+
+
+def membership_cache_timeout():
+    """
+    How long entries are kept. A per-process cache can't see version bumps made in
+    other processes, so there entries only live a few seconds.
+    """
+    if isinstance(caches['default'], LocMemCache):
+        return min(settings.COURSE_MEMBERSHIP_CACHE_SECONDS, settings.COURSE_MEMBERSHIP_LOCAL_CACHE_SECONDS)
+    return settings.COURSE_MEMBERSHIP_CACHE_SECONDS
+
+
+def _new_version():
+    # Fresh versions start from the clock rather than 0, so if the version key is
+    # evicted, entries written under the old one can never match the new one.
+    return time.time_ns()
+
+
+def _count(counter, amount=1):
+    with _counter_lock:
+        _counters[counter] += amount
+
+
+def membership_cache_stats():
+    """Hit/miss counters of the shared membership cache in this process."""
+    with _counter_lock:
+        stats = dict(_counters)
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else None
+    return stats
+
+
+def reset_membership_cache_stats():
+    with _counter_lock:
+        for counter in _counters:
+            _counters[counter] = 0
+
+
+def load_course_membership(user_id):
+    # Both memberships come back from a single query against the two M2M tables.
+    taught = Course.teachers.through.objects.filter(customuser_id=user_id).annotate(kind=Value('t')).values_list('course_id', 'kind')
+    enrolled = Course.students.through.objects.filter(customuser_id=user_id).annotate(kind=Value('e')).values_list('course_id', 'kind')
+    rows = list(taught.union(enrolled, all=True))
+    return CourseMembership(
+        taught=(course_id for course_id, kind in rows if kind == 't'),
+        enrolled=(course_id for course_id, kind in rows if kind == 'e'),
+    )
+
+
+def cached_course_membership(user_id):
+    """
+    Membership from the shared cache, loaded from the database on a miss. Entries
+    carry the version of the user's membership they were read at and are ignored
+    once it is bumped, so a request that read the old rows while an enrollment was
+    changing can't put a stale entry back.
+    """
+    entry_key, version_key = membership_cache_key(user_id), membership_version_key(user_id)
+    cached = cache.get_many([entry_key, version_key])
+    version = cached.get(version_key)
+    entry = cached.get(entry_key)
+    if version is not None and entry is not None and entry[0] == version:
+        _count('hits')
+        return CourseMembership(taught=entry[1], enrolled=entry[2])
+
+    _count('misses')
+    if version is None:
+        # Start a version before reading, so a bump racing with this load still retires the entry.
+        cache.add(version_key, _new_version(), None)
+        version = cache.get(version_key)
+    membership = load_course_membership(user_id)
+    if version is not None:
+        cache.set(entry_key, (version, tuple(membership.taught), tuple(membership.enrolled)), membership_cache_timeout())
+    return membership
+
+
+def course_membership(user):
+    """
+    The user's CourseMembership, taken from the shared cache on first use and then
+    kept on the user object, so every permission check, queryset and serializer in
+    a request shares it.
+    """
+    membership = getattr(user, CACHE_ATTRIBUTE, None)
+    if membership is None:
+        membership = cached_course_membership(user.pk) if user.is_authenticated else CourseMembership()
+        setattr(user, CACHE_ATTRIBUTE, membership)
+    return membership
+
+
+def forget_course_membership(user):
+    """Drop the memoized membership, e.g. after the user was enrolled during this request."""
+    user.__dict__.pop(CACHE_ATTRIBUTE, None)
+
+
+def _bump_versions(user_ids):
+    for user_id in user_ids:
+        key = membership_version_key(user_id)
+        # The version key never expires; if it is evicted anyway, the next one starts afresh.
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _new_version(), None)
+    _count('invalidations', len(user_ids))
+
+
+def invalidate_course_membership(user_ids):
+    """
+    Expire the cached membership of these users once the current transaction
+    commits; bumping earlier would let another request cache the uncommitted rows'
+    old state under the new version.
+    """
+    user_ids = set(user_ids)
+    if user_ids:
+        transaction.on_commit(lambda: _bump_versions(user_ids))
@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.mail import EmailMessage, get_connection
+
+from django_project.utils import chunked
+from users.models import CustomUser
+from .models import Course
+
+BROADCAST_AUDIENCES = {
+    'all': None,
+    'students': ['student'],
+    'teachers': ['teacher'],
+    'staff': ['teacher', 'admin'],
+}
+
+
+def validate_broadcast_audience():
+    """Fail at startup on a misspelt COURSE_BROADCAST_AUDIENCE, not silently in the background sender."""
+    audience = settings.COURSE_BROADCAST_AUDIENCE
+    if audience != 'none' and audience not in BROADCAST_AUDIENCES:
+        choices = ', '.join([*BROADCAST_AUDIENCES, 'none'])
+        raise ImproperlyConfigured(f"COURSE_BROADCAST_AUDIENCE must be one of {choices}, not {audience!r}.")
+
+
+def broadcast_recipients(audience):
+    """Lazily evaluated queryset of the email addresses a course broadcast goes to."""
+    users = CustomUser.objects.filter(is_active=True).exclude(email='')
+    roles = BROADCAST_AUDIENCES[audience]
+    if roles is not None:
+        users = users.filter(role__in=roles)
+    return users.order_by().values_list('email', flat=True)
+
+
+def broadcast_course_creation(course_id, audience=None, chunk_size=None):
+    """
+    Email the configured audience about a newly created course.
+
+    Addresses are streamed from the database and sent as one BCC'd message per
+    chunk over a single SMTP connection, so memory stays bounded however many
+    users there are.
+    """
+    audience = audience or settings.COURSE_BROADCAST_AUDIENCE
+    chunk_size = chunk_size or settings.COURSE_BROADCAST_CHUNK_SIZE
+    course = Course.objects.filter(pk=course_id).only('name', 'description').first()
+    if course is None:
+        return 0
+
+    subject = f"New Course Created: {course.name}"
+    message = f"A new course has been created:\n\nName: {course.name}\nDescription: {course.description}\n\nCheck it out on the platform!"
+    from_email = settings.EMAIL_HOST_USER
+
+    sent = 0
+    emails = broadcast_recipients(audience).iterator(chunk_size=chunk_size)
+    with get_connection() as connection:
+        for chunk in chunked(emails, chunk_size):
+            connection.send_messages([EmailMessage(subject, message, from_email, bcc=chunk, connection=connection)])
+            sent += len(chunk)
+    return sent
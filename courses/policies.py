@@ -0,0 +1,182 @@
+"""
+Row-level access policies. Each model declares, per role, which rows a user may
+see; the same declaration filters list querysets (one WHERE clause, no
+per-request membership subqueries) and answers object checks from the user's
+cached course membership.
+
+    ASSIGNMENT_POLICY = AccessPolicy(
+        admin=EVERYTHING,
+        teacher=InCourse('course', 'taught'),
+        student=InCourse('course', 'enrolled'),
+    )
+    ASSIGNMENT_POLICY.filter(Assignment.objects.all(), user)
+    ASSIGNMENT_POLICY.allows(user, assignment)
+
+Roles a policy doesn't mention see nothing.
+"""
+import operator
+from abc import ABC, abstractmethod
+from functools import reduce
+
+from django.db.models import Exists, OuterRef, Q
+
+from .membership import cached_course_membership, course_membership
+from .models import Course
+
+
+def _follow(obj, path):
+    """
+    Walk a `a__b__c` lookup path on an instance. The last step reads the foreign
+    key column, so `assignment__course` loads the assignment but not the course.
+    """
+    *relations, last = path.split('__')
+    for name in relations:
+        obj = getattr(obj, name)
+        if obj is None:
+            return None
+    return getattr(obj, f'{last}_id')
+
+
+class Rule(ABC):
+    @abstractmethod
+    def q(self, user, membership):
+        """Q object selecting the rows this rule grants."""
+
+    @abstractmethod
+    def allows(self, user, membership, obj):
+        """Whether this rule grants `obj`, answered without querying its table."""
+
+    def __or__(self, other):
+        return AnyOf(self, other)
+
+
+class Everything(Rule):
+    def q(self, user, membership):
+        return Q()
+
+    def allows(self, user, membership, obj):
+        return True
+
+
+class Nothing(Rule):
+    def q(self, user, membership):
+        return Q(pk__in=[])
+
+    def allows(self, user, membership, obj):
+        return False
+
+
+EVERYTHING = Everything()
+NOTHING = Nothing()
+
+
+class InCourse(Rule):
+    """Rows whose course (reached by `path`) the user teaches ('taught') or attends ('enrolled')."""
+
+    def __init__(self, path, relation):
+        self.path = path
+        self.relation = relation
+
+    def q(self, user, membership):
+        return Q(**{f'{self.path}_id__in': getattr(membership, self.relation)})
+
+    def allows(self, user, membership, obj):
+        return _follow(obj, self.path) in getattr(membership, self.relation)
+
+
+class OwnedBy(Rule):
+    """Rows whose user field (reached by `path`) is the user."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def q(self, user, membership):
+        return Q(**{f'{self.path}_id': user.pk})
+
+    def allows(self, user, membership, obj):
+        return _follow(obj, self.path) == user.pk
+
+
+class Self(Rule):
+    """The user's own row, on the user model (`path=''`) or a model pointing at it."""
+
+    def __init__(self, path=''):
+        self.path = path
+
+    def q(self, user, membership):
+        return Q(**{f'{self.path}_id' if self.path else 'pk': user.pk})
+
+    def allows(self, user, membership, obj):
+        return (_follow(obj, self.path) if self.path else obj.pk) == user.pk
+
+
+class CourseMembers(Rule):
+    """
+    Users with `role` who are `member_relation` ('students' or 'teachers') of a
+    course the user is `relation` ('taught' or 'enrolled') in, e.g. a teacher's
+    students. Compiles to an EXISTS on the M2M table, so rows are never duplicated
+    and need no DISTINCT.
+    """
+
+    def __init__(self, member_relation, relation, role, path=''):
+        self.through = getattr(Course, member_relation).through
+        self.member_relation = member_relation
+        self.relation = relation
+        self.role = role
+        self.path = path
+
+    def q(self, user, membership):
+        course_ids = getattr(membership, self.relation)
+        if not course_ids:
+            return NOTHING.q(user, membership)
+        prefix = f'{self.path}__' if self.path else ''
+        members = self.through.objects.filter(
+            customuser_id=OuterRef(f'{self.path}_id' if self.path else 'pk'), course_id__in=course_ids,
+        )
+        return Q(Exists(members), **{f'{prefix}role': self.role})
+
+    def allows(self, user, membership, obj):
+        member = getattr(obj, self.path) if self.path else obj
+        if member is None or member.role != self.role:
+            return False
+        # The member's own membership usually comes straight from the cache.
+        theirs = cached_course_membership(member.pk)
+        their_courses = theirs.enrolled if self.member_relation == 'students' else theirs.taught
+        return not their_courses.isdisjoint(getattr(membership, self.relation))
+
+
+class AnyOf(Rule):
+    def __init__(self, *rules):
+        self.rules = rules
+
+    def q(self, user, membership):
+        return reduce(operator.or_, (rule.q(user, membership) for rule in self.rules))
+
+    def allows(self, user, membership, obj):
+        return any(rule.allows(user, membership, obj) for rule in self.rules)
+
+
+class AccessPolicy:
+    def __init__(self, **rules):
+        self.rules = rules
+
+    def rule_for(self, user):
+        if not user.is_authenticated:
+            return NOTHING
+        return self.rules.get(user.role, NOTHING)
+
+    def filter(self, queryset, user):
+        """`queryset` narrowed to the rows `user` may see."""
+        rule = self.rule_for(user)
+        if rule is EVERYTHING:
+            return queryset
+        if rule is NOTHING:
+            return queryset.none()
+        return queryset.filter(rule.q(user, course_membership(user)))
+
+    def allows(self, user, obj):
+        """Whether `user` may see `obj`, decided without querying the object's table."""
+        rule = self.rule_for(user)
+        if rule is EVERYTHING or rule is NOTHING:
+            return rule is EVERYTHING
+        return rule.allows(user, course_membership(user), obj)
@@ -1,20 +1,16 @@
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
 from django.dispatch import receiver
-from django.core.mail import send_mail
 from django.conf import settings
+from django_project.tasks import defer
 from .models import Course, CourseActivityLog
-from users.models import CustomUser  
+from .membership import invalidate_course_membership
+from .notifications import broadcast_course_creation
 
 @receiver(post_save, sender=Course)
 def send_course_creation_email(sender, instance, created, **kwargs):
-    if created:
-        users = CustomUser.objects.all() 
-        subject = f"New Course Created: {instance.name}"
-        message = f"A new course has been created:\n\nName: {instance.name}\nDescription: {instance.description}\n\nCheck it out on the platform!"
-        from_email = settings.EMAIL_HOST_USER
-
-        recipient_list = [user.email for user in users if user.email]
-        send_mail(subject, message, from_email, recipient_list)
+    if created and settings.COURSE_BROADCAST_AUDIENCE != 'none':
+        # Runs after the course-creation transaction commits, off the request thread.
+        defer(broadcast_course_creation, instance.pk)
 
 
 @receiver(post_save, sender=Course)
@@ -40,4 +36,30 @@ def log_course_delete(sender, instance, **kwargs):
             course=instance,
             user=instance.created_by,
             action='delete'
-        )
\ No newline at end of file
+        )
+
+
+@receiver(m2m_changed, sender=Course.teachers.through)
+@receiver(m2m_changed, sender=Course.students.through)
+def invalidate_membership_on_change(sender, instance, action, reverse, model, pk_set, **kwargs):
+    if reverse:
+        # Changed from the user's side (user.enrolled_courses.add(...)): only that user is affected.
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            invalidate_course_membership([instance.pk])
+        return
+    field = 'teachers' if sender is Course.teachers.through else 'students'
+    if action == 'pre_clear':
+        # pk_set is not given for clear(); remember who is about to be removed.
+        instance._cleared_member_ids = list(getattr(instance, field).values_list('pk', flat=True))
+    elif action == 'post_clear':
+        invalidate_course_membership(instance.__dict__.pop('_cleared_member_ids', []))
+    elif action in ('post_add', 'post_remove'):
+        invalidate_course_membership(pk_set or [])
+
+
+@receiver(pre_delete, sender=Course)
+def invalidate_membership_on_delete(sender, instance, **kwargs):
+    # The M2M rows go with the course without an m2m_changed signal.
+    invalidate_course_membership(
+        list(instance.teachers.values_list('pk', flat=True)) + list(instance.students.values_list('pk', flat=True))
+    )
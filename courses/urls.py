@@ -11,5 +11,6 @@ urlpatterns = [
     path('', include(router.urls)),
     path('course/<int:course_id>/enroll/', views.request_enrollment, name='request_enrollment'),
     path('enrollment/approve/<int:enrollment_request_id>/', approve_enrollment, name='approve_enrollment'),
+    path('membership-cache/', views.membership_cache, name='membership_cache'),
 ]
 
@@ -3,10 +3,12 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 from django.shortcuts import get_object_or_404
+from django.db import transaction
 
 from .models import Course, EnrollmentRequest, CourseActivityLog
 from .serializers import CourseSerializer
 from .permissions import IsAdminOrReadOnly
+from .membership import membership_cache_stats, reset_membership_cache_stats
 from django.views.decorators.csrf import csrf_exempt
 
 from django_filters.rest_framework import DjangoFilterBackend
@@ -71,11 +73,24 @@ def approve_enrollment(request, enrollment_request_id):
     enrollment_request = get_object_or_404(EnrollmentRequest, id=enrollment_request_id)
     if request.user.role != 'admin':
         return Response({"message": "Only admins can approve enrollment requests."}, status=status.HTTP_403_FORBIDDEN)
-    enrollment_request.approved = True
-    enrollment_request.status = 'approved' 
-    enrollment_request.save()
-    
-    course = enrollment_request.course
-    course.students.add(enrollment_request.student)
+    with transaction.atomic():
+        enrollment_request.approved = True
+        enrollment_request.status = 'approved' 
+        enrollment_request.save()
+
+        course = enrollment_request.course
+        # m2m_changed expires the student's cached membership once this commits.
+        course.students.add(enrollment_request.student)
+
+    return Response({"message": "Enrollment request approved successfully!"}, status=status.HTTP_200_OK)
 
-    return Response({"message": "Enrollment request approved successfully!"}, status=status.HTTP_200_OK)
\ No newline at end of file
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAuthenticated])
+def membership_cache(request):
+    """Hit/miss counters of this process's course membership cache; DELETE resets them."""
+    if request.user.role != 'admin':
+        return Response({"message": "Only admins can view cache statistics."}, status=status.HTTP_403_FORBIDDEN)
+    if request.method == 'DELETE':
+        reset_membership_cache_stats()
+    return Response(membership_cache_stats(), status=status.HTTP_200_OK)
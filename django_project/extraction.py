@@ -0,0 +1,95 @@
+import io
+import os
+import zipfile
+from xml.etree.ElementTree import iterparse
+
+try:
+    from pypdf import PdfReader
+except ImportError:  # PDF text extraction is optional
+    PdfReader = None
+
+# Extracted text is truncated here so one huge file can't exhaust memory.
+MAX_TEXT_CHARS = 2_000_000
+READ_SIZE = 64 * 1024
+
+TEXT_EXTENSIONS = {
+    '.txt', '.md', '.rst', '.tex', '.csv', '.json', '.xml', '.html', '.htm', '.css',
+    '.py', '.ipynb', '.java', '.c', '.h', '.cpp', '.hpp', '.cs', '.js', '.ts', '.go',
+    '.rb', '.php', '.sql', '.r', '.m', '.kt', '.swift', '.rs', '.sh',
+}
+WORD_NAMESPACE = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+
+class UnsupportedFormat(Exception):
+    pass
+
+
+def _read_text(fileobj, limit):
+    decoder = io.TextIOWrapper(fileobj, encoding='utf-8', errors='replace')
+    try:
+        parts, size = [], 0
+        while size < limit:
+            part = decoder.read(min(READ_SIZE, limit - size))
+            if not part:
+                break
+            parts.append(part)
+            size += len(part)
+        return ''.join(parts)
+    finally:
+        decoder.detach()
+
+
+def _read_docx(fileobj, limit):
+    parts, size = [], 0
+    with zipfile.ZipFile(fileobj) as archive, archive.open('word/document.xml') as document:
+        for event, element in iterparse(document, events=('end',)):
+            if element.tag == WORD_NAMESPACE + 't' and element.text:
+                parts.append(element.text)
+                size += len(element.text)
+            elif element.tag == WORD_NAMESPACE + 'p':
+                parts.append('\n')
+                # Drop finished paragraphs so the parsed tree never grows.
+                element.clear()
+            if size >= limit:
+                break
+    return ''.join(parts)[:limit]
+
+
+def _read_pdf(fileobj, limit):
+    if PdfReader is None:
+        raise UnsupportedFormat("Install pypdf to extract text from PDF files.")
+    parts, size = [], 0
+    for page in PdfReader(fileobj).pages:
+        text = page.extract_text() or ''
+        parts.append(text)
+        size += len(text)
+        if size >= limit:
+            break
+    return '\n'.join(parts)[:limit]
+
+
+def extract_text(fileobj, name, limit=MAX_TEXT_CHARS):
+    """
+    Plain text of an uploaded file, read from a binary file object. Raises
+    UnsupportedFormat for file types text can't be pulled out of.
+    """
+    extension = os.path.splitext(name or '')[1].lower()
+    if extension in TEXT_EXTENSIONS:
+        return _read_text(fileobj, limit)
+    if extension == '.docx':
+        return _read_docx(fileobj, limit)
+    if extension == '.pdf':
+        return _read_pdf(fileobj, limit)
+    raise UnsupportedFormat(f"Cannot extract text from '{extension or name}' files.")
+
+
+def extract_file_text(path, name, limit=MAX_TEXT_CHARS):
+    """
+    Text of the file at `path`, or '' if none can be extracted. This module does not
+    import Django, so process pools can run this without setting it up.
+    """
+    try:
+        with open(path, 'rb') as fileobj:
+            return extract_text(fileobj, name, limit)
+    except (UnsupportedFormat, OSError):
+        return ''
@@ -93,6 +93,14 @@ DATABASES = {
 }
 
 
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='educonnect'),
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -139,7 +147,8 @@ AUTH_USER_MODEL = 'users.CustomUser'
 REST_FRAMEWORK = {
     
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'accounts.authentication.ExpiringTokenAuthentication',
+        'accounts.authentication.SignedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication', 
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -161,6 +170,60 @@ EMAIL_HOST_USER = config('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD') 
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER 
 
+# Background tasks (django_project.tasks.defer)
+BACKGROUND_TASK_WORKERS = config('BACKGROUND_TASK_WORKERS', default=2, cast=int)
+BACKGROUND_TASKS_EAGER = config('BACKGROUND_TASKS_EAGER', default=False, cast=bool)
+# Processes for CPU-bound work such as text extraction (django_project.tasks.run_in_processes)
+BACKGROUND_PROCESS_WORKERS = config('BACKGROUND_PROCESS_WORKERS', default=2, cast=int)
+
+# Who gets the "new course" email: all, students, teachers, staff or none
+COURSE_BROADCAST_AUDIENCE = config('COURSE_BROADCAST_AUDIENCE', default='all')
+COURSE_BROADCAST_CHUNK_SIZE = config('COURSE_BROADCAST_CHUNK_SIZE', default=500, cast=int)
+
+# Resumable assignment uploads (blog.uploads)
+ASSIGNMENT_UPLOAD_DIR = config('ASSIGNMENT_UPLOAD_DIR', default=str(BASE_DIR / 'upload_spool'))
+ASSIGNMENT_UPLOAD_CHUNK_SIZE = config('ASSIGNMENT_UPLOAD_CHUNK_SIZE', default=8 * 1024 * 1024, cast=int)
+ASSIGNMENT_UPLOAD_MAX_SIZE = config('ASSIGNMENT_UPLOAD_MAX_SIZE', default=4 * 1024 * 1024 * 1024, cast=int)
+ASSIGNMENT_UPLOAD_EXPIRY_HOURS = config('ASSIGNMENT_UPLOAD_EXPIRY_HOURS', default=48, cast=int)
+
+# File downloads: '' streams from Django, 'x-accel-redirect' (nginx) or 'x-sendfile'
+# (Apache/lighttpd) hand the file to the web server. With nginx, map
+# FILE_DOWNLOAD_ACCEL_PREFIX to MEDIA_ROOT in an `internal` location.
+# Media URLs of stored files end in the original name (blobs/<aa>/<sha256>/<name>)
+# while the file is blobs/<aa>/<sha256>; have the web server drop the last segment,
+# e.g. nginx `rewrite ^(.*/blobs/[0-9a-f]{2}/[0-9a-f]{64})/[^/]+$ $1 break;`.
+FILE_DOWNLOAD_OFFLOAD = config('FILE_DOWNLOAD_OFFLOAD', default='')
+FILE_DOWNLOAD_ACCEL_PREFIX = config('FILE_DOWNLOAD_ACCEL_PREFIX', default='/protected-media/')
+
+# Longest a resource share link may stay valid, in seconds (resources.sharing)
+RESOURCE_SHARE_LINK_MAX_AGE = config('RESOURCE_SHARE_LINK_MAX_AGE', default=7 * 24 * 3600, cast=int)
+
+# Thumbnails and text previews of resources, keyed by content hash (resources.previews)
+RESOURCE_PREVIEW_DIR = config('RESOURCE_PREVIEW_DIR', default=str(BASE_DIR / 'resource_previews'))
+
+# Near-duplicate screening of assignment submissions (blog.similarity)
+SUBMISSION_SIMILARITY_THRESHOLD = config('SUBMISSION_SIMILARITY_THRESHOLD', default=0.5, cast=float)
+
+# Course membership cache (courses.membership). Enrollment changes bump a version
+# in the cache. A per-process cache such as the default LocMemCache can't share
+# those bumps, so there entries are kept for COURSE_MEMBERSHIP_LOCAL_CACHE_SECONDS
+# only; configure a shared cache (Redis, Memcached) to keep them for
+# COURSE_MEMBERSHIP_CACHE_SECONDS.
+COURSE_MEMBERSHIP_CACHE_SECONDS = config('COURSE_MEMBERSHIP_CACHE_SECONDS', default=60 * 60, cast=int)
+COURSE_MEMBERSHIP_LOCAL_CACHE_SECONDS = config('COURSE_MEMBERSHIP_LOCAL_CACHE_SECONDS', default=5, cast=int)
+
+# API tokens (accounts.authentication): a token unused for AUTH_TOKEN_IDLE_HOURS
+# expires; activity renews it at most every AUTH_TOKEN_REFRESH_SECONDS. Lookups are
+# cached for AUTH_TOKEN_CACHE_SECONDS; with a per-process cache a revoked token
+# can keep working in other processes for that long.
+AUTH_TOKEN_IDLE_HOURS = config('AUTH_TOKEN_IDLE_HOURS', default=7 * 24, cast=int)
+AUTH_TOKEN_REFRESH_SECONDS = config('AUTH_TOKEN_REFRESH_SECONDS', default=15 * 60, cast=int)
+AUTH_TOKEN_CACHE_SECONDS = config('AUTH_TOKEN_CACHE_SECONDS', default=60, cast=int)
+# Stateless login mode: signed access tokens are checked without a lookup and can't
+# be revoked, so keep them short; refresh tokens are stored and revocable.
+AUTH_ACCESS_TOKEN_SECONDS = config('AUTH_ACCESS_TOKEN_SECONDS', default=5 * 60, cast=int)
+AUTH_REFRESH_TOKEN_DAYS = config('AUTH_REFRESH_TOKEN_DAYS', default=14, cast=int)
+
 
 
 
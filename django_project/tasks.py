@@ -0,0 +1,75 @@
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_process_pool = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.BACKGROUND_TASK_WORKERS,
+            thread_name_prefix='background-task',
+        )
+    return _executor
+
+
+def _run(func, args, kwargs):
+    try:
+        func(*args, **kwargs)
+    except Exception:
+        logger.exception("Background task %s failed", getattr(func, '__name__', func))
+    finally:
+        # Worker threads get their own DB connections; don't leak them.
+        connections.close_all()
+
+
+def defer(func, *args, **kwargs):
+    """
+    Run `func(*args, **kwargs)` in a background thread once the current
+    transaction commits (immediately if there is no transaction).
+
+    With BACKGROUND_TASKS_EAGER enabled the call runs inline after commit instead,
+    which is what management commands and tests usually want.
+    """
+    if settings.BACKGROUND_TASKS_EAGER:
+        transaction.on_commit(lambda: func(*args, **kwargs))
+    else:
+        transaction.on_commit(lambda: _get_executor().submit(_run, func, args, kwargs))
+
+
+def _get_process_pool():
+    global _process_pool
+    if _process_pool is None:
+        # spawn, not fork: the web process has threads (and DB connections) a fork would copy.
+        _process_pool = ProcessPoolExecutor(
+            max_workers=settings.BACKGROUND_PROCESS_WORKERS,
+            mp_context=multiprocessing.get_context('spawn'),
+        )
+    return _process_pool
+
+
+def run_in_processes(func, calls):
+    """
+    Run `func(*args)` for every args tuple in `calls` on the shared process pool and
+    return the results in order. For CPU-bound work (parsing PDFs, rendering images)
+    that would otherwise hold the GIL. `func` must live in a module that can be
+    imported without Django being set up.
+    """
+    global _process_pool
+    pool = _get_process_pool()
+    futures = [pool.submit(func, *args) for args in calls]
+    try:
+        return [future.result() for future in futures]
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for memory); start a fresh pool next time.
+        _process_pool = None
+        raise
@@ -15,9 +15,10 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from resources.downloads import serve_blob
 
 
 urlpatterns = [
@@ -34,4 +35,6 @@ urlpatterns = [
 
 
 if settings.DEBUG:
+    # Content-addressed names end in the original file name, which isn't on disk.
+    urlpatterns += [re_path(rf'^{settings.MEDIA_URL.lstrip("/")}(?P<name>blobs/.+)$', serve_blob)]
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
@@ -0,0 +1,11 @@
+from itertools import islice
+
+
+def chunked(iterable, size):
+    """Yield lists of at most `size` items from `iterable` without materializing it."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
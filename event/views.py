@@ -4,7 +4,7 @@ from .serializers import EventSerializer
 from django.core.mail import send_mail
 from django.conf import settings
 from courses.models import Course
-from rest_framework.authentication import TokenAuthentication
+from accounts.authentication import ExpiringTokenAuthentication, SignedTokenAuthentication
 from rest_framework.permissions import IsAuthenticated
 from users.models import CustomUser
 from django_filters.rest_framework import DjangoFilterBackend
@@ -13,7 +13,7 @@ from rest_framework import filters
 class EventViewSet(viewsets.ModelViewSet):
     queryset = Event.objects.all()
     serializer_class = EventSerializer
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [ExpiringTokenAuthentication, SignedTokenAuthentication]
     permission_classes = [IsAuthenticated]
     
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
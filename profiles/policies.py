@@ -0,0 +1,8 @@
+from courses.policies import AccessPolicy, EVERYTHING, CourseMembers, Self
+
+# The same people as users.policies.USER_POLICY, reached through Profile.user.
+PROFILE_POLICY = AccessPolicy(
+    admin=EVERYTHING,
+    teacher=Self('user') | CourseMembers('students', 'taught', role='student', path='user'),
+    student=Self('user') | CourseMembers('teachers', 'enrolled', role='teacher', path='user'),
+)
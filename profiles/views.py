@@ -3,16 +3,17 @@ from rest_framework.response import Response
 from .models import Profile, Follow, Connection, FriendRequest
 from .serializers import ProfileSerializer, FollowSerializer, ConnectionSerializer, FriendRequestSerializer
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.authentication import TokenAuthentication
+from accounts.authentication import ExpiringTokenAuthentication, SignedTokenAuthentication
 from django.db.models import Q
 from courses.models import Course
+from .policies import PROFILE_POLICY
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
 
 class ProfileViewSet(viewsets.ModelViewSet):
     queryset = Profile.objects.all()
     serializer_class = ProfileSerializer
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [ExpiringTokenAuthentication, SignedTokenAuthentication]
     permission_classes = [IsAuthenticated]
     
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -24,24 +25,10 @@ class ProfileViewSet(viewsets.ModelViewSet):
     
 
     def get_queryset(self):
-        user = self.request.user
-
-        if user.role == 'teacher':
-            courses = Course.objects.filter(teachers=user)
-            students = Profile.objects.filter(user__enrolled_courses__in=courses, user__role='student')
-            return Profile.objects.filter(Q(user=user) | Q(id__in=students.values_list('id', flat=True)))
-
-        if user.role == 'student':
-            courses = user.enrolled_courses.all()
-            teachers = Profile.objects.filter(user__courses_taught__in=courses, user__role='teacher')
-            return Profile.objects.filter(Q(user=user) | Q(id__in=teachers.values_list('id', flat=True)))
-
-        if user.role == 'admin':
-            return Profile.objects.all()
-        return Profile.objects.none()
+        return PROFILE_POLICY.filter(Profile.objects.all(), self.request.user)
 
 class FollowViewSet(viewsets.ViewSet):
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [ExpiringTokenAuthentication, SignedTokenAuthentication]
     permission_classes = [IsAuthenticated]
     
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
@@ -72,7 +59,7 @@ class FollowViewSet(viewsets.ViewSet):
 class FriendRequestViewSet(viewsets.ModelViewSet):
     queryset = FriendRequest.objects.all()
     serializer_class = FriendRequestSerializer
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [ExpiringTokenAuthentication, SignedTokenAuthentication]
     permission_classes = [IsAuthenticated]
     
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
@@ -117,7 +104,7 @@ class FriendRequestViewSet(viewsets.ModelViewSet):
 class ConnectionViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Connection.objects.all()
     serializer_class = ConnectionSerializer
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [ExpiringTokenAuthentication, SignedTokenAuthentication]
     permission_classes = [IsAuthenticated]
     
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
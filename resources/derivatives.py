@@ -0,0 +1,71 @@
+"""
+Preview rendering, run in the background process pool. Like
+django_project.extraction this module must not import Django: pool processes load
+it without setting Django up.
+"""
+import json
+import os
+import tempfile
+
+from django_project.extraction import extract_file_text
+
+try:
+    from PIL import Image
+except ImportError:  # thumbnails of images need Pillow
+    Image = None
+
+try:
+    import fitz  # PyMuPDF
+except ImportError:  # thumbnails of PDFs need PyMuPDF
+    fitz = None
+
+PREVIEW_TEXT_CHARS = 1000
+THUMBNAIL_SIZE = (320, 320)
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.gif', '.webp', '.bmp', '.tif', '.tiff'}
+
+
+def _write_atomically(path, write):
+    """Write through a temporary file so readers never see half a derivative."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=directory, delete=False) as partial:
+        write(partial)
+    os.replace(partial.name, path)
+
+
+def _render_thumbnail(path, extension, thumbnail_path):
+    if extension in IMAGE_EXTENSIONS and Image is not None:
+        with Image.open(path) as image:
+            image.thumbnail(THUMBNAIL_SIZE)
+            if image.mode not in ('RGB', 'RGBA', 'L'):
+                image = image.convert('RGBA')
+            _write_atomically(thumbnail_path, lambda out: image.save(out, format='PNG'))
+        return True
+    if extension == '.pdf' and fitz is not None:
+        with fitz.open(path) as document:
+            if not document.page_count:
+                return False
+            page = document[0]
+            zoom = min(THUMBNAIL_SIZE[0] / page.rect.width, THUMBNAIL_SIZE[1] / page.rect.height)
+            png = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom)).tobytes('png')
+        _write_atomically(thumbnail_path, lambda out: out.write(png))
+        return True
+    return False
+
+
+def render_preview(path, name, thumbnail_path, manifest_path):
+    """
+    Write a first-page/image thumbnail to `thumbnail_path` (when the format and the
+    installed libraries allow it) and a JSON manifest with a short text preview.
+    Returns the manifest.
+    """
+    extension = os.path.splitext(name)[1].lower()
+    try:
+        has_thumbnail = _render_thumbnail(path, extension, thumbnail_path)
+    except Exception:
+        # A corrupt file still gets its text preview.
+        has_thumbnail = False
+    text = ' '.join(extract_file_text(path, name, PREVIEW_TEXT_CHARS * 2).split())[:PREVIEW_TEXT_CHARS]
+    manifest = {'text': text, 'thumbnail': has_thumbnail}
+    _write_atomically(manifest_path, lambda out: out.write(json.dumps(manifest).encode()))
+    return manifest
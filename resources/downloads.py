@@ -0,0 +1,139 @@
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+from .storage import content_addressed_storage
+
+RANGE_READ_SIZE = 64 * 1024
+SINGLE_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def file_validators(fieldfile):
+    """
+    (etag, last-modified timestamp, size, path) of a stored file. Blobs are named by
+    their SHA-256, which makes a perfect ETag; other files fall back to size and mtime.
+    """
+    storage = fieldfile.storage
+    path = storage.path(fieldfile.name)
+    stat = os.stat(path)
+    digest = storage.blob_digest(fieldfile.name) if hasattr(storage, 'blob_digest') else None
+    etag = f'"{digest}"' if digest else f'"{stat.st_size:x}-{int(stat.st_mtime):x}"'
+    return etag, int(stat.st_mtime), stat.st_size, path
+
+
+def parse_range(header, size):
+    """
+    (start, end) of a single `bytes=` range, inclusive. None means "send the whole
+    file" (no header, several ranges, or syntax we don't handle); ValueError means
+    the range can't be satisfied.
+    """
+    match = SINGLE_RANGE.match(header.strip()) if header else None
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if first == '':
+        # Suffix range: the last N bytes.
+        length = int(last)
+        if length == 0:
+            raise ValueError(header)
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+def if_range_matches(request, etag, last_modified):
+    value = request.headers.get('If-Range')
+    if not value:
+        return True
+    if value.startswith(('"', 'W/')):
+        return value == etag
+    return parse_http_date_safe(value) == last_modified
+
+
+def iter_range(path, start, end):
+    with open(path, 'rb') as source:
+        source.seek(start)
+        remaining = end - start + 1
+        while remaining:
+            data = source.read(min(RANGE_READ_SIZE, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            yield data
+
+
+def offload_response(path, storage):
+    """Let the front-end server send the file. Returns None if offloading isn't configured."""
+    mode = settings.FILE_DOWNLOAD_OFFLOAD
+    if mode == 'x-sendfile':
+        response = HttpResponse()
+        response['X-Sendfile'] = path
+        return response
+    if mode == 'x-accel-redirect':
+        relative = os.path.relpath(path, storage.location).replace(os.sep, '/')
+        response = HttpResponse()
+        response['X-Accel-Redirect'] = settings.FILE_DOWNLOAD_ACCEL_PREFIX.rstrip('/') + '/' + relative
+        return response
+    return None
+
+
+def serve_file(request, fieldfile, filename=None, as_attachment=True):
+    """
+    Download response for a stored file. Conditional requests get a 304 (or 412)
+    before anything is opened. With FILE_DOWNLOAD_OFFLOAD set the web server sends
+    the bytes; otherwise they are streamed from here, honouring a single byte range.
+    """
+    filename = filename or os.path.basename(fieldfile.name)
+    etag, last_modified, size, path = file_validators(fieldfile)
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = offload_response(path, fieldfile.storage)
+    if response is None:
+        try:
+            byte_range = parse_range(request.headers.get('Range'), size) if if_range_matches(request, etag, last_modified) else None
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+        if byte_range is None:
+            response = FileResponse(open(path, 'rb'), as_attachment=as_attachment, filename=filename)
+        else:
+            start, end = byte_range
+            response = StreamingHttpResponse(iter_range(path, start, end), status=206)
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            response['Content-Length'] = str(end - start + 1)
+
+    if response.status_code in (200, 206):
+        if not isinstance(response, FileResponse):
+            response['Content-Type'] = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+            response['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+        response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    # Downloads need a login, so shared caches must not keep them.
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def serve_blob(request, name):
+    """
+    Development media view for content-addressed names: `blobs/<aa>/<sha256>/<name>`
+    is read from the shared blob file. In production the web server maps these URLs
+    the same way.
+    """
+    storage = content_addressed_storage
+    if storage.blob_digest(name) is None:
+        raise Http404("Not a stored file.")
+    try:
+        return FileResponse(open(storage.path(name), 'rb'), filename=os.path.basename(name))
+    except FileNotFoundError:
+        raise Http404("The file is missing.")
@@ -0,0 +1,125 @@
+import os
+
+from django.db import connection
+from django.utils.html import escape
+
+from django_project.extraction import extract_file_text
+from django_project.tasks import run_in_processes
+from .models import Resource
+from .previews import content_digest
+
+FTS_TABLE = 'resources_resource_fts'
+# bm25 column weights: a match in the file name counts most, then category/tags, then the text.
+RANK_WEIGHTS = (10.0, 5.0, 1.0)
+MAX_SEARCH_RESULTS = 50
+# Private-use characters FTS5 wraps matches in; swapped for <mark> once the text is escaped.
+MATCH_START, MATCH_END = '\ue000', '\ue001'
+
+def _extract_texts(resources):
+    """Extract the resources' text concurrently in the process pool; returns the texts in order."""
+    with_files = [resource for resource in resources if resource.file]
+    texts = dict(zip(
+        (resource.pk for resource in with_files),
+        run_in_processes(extract_file_text, [(resource.file.path, resource.file.name) for resource in with_files]),
+    ))
+    return [texts.get(resource.pk, '') for resource in resources]
+
+
+def fts_available():
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = %s", [FTS_TABLE])
+        return cursor.fetchone() is not None
+
+
+def _file_digest(resource):
+    try:
+        return content_digest(resource.file) if resource.file else ''
+    except (FileNotFoundError, ValueError):
+        return ''
+
+
+def _write_entry(resource, body, digest):
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [resource.pk])
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, tags, body, digest) VALUES (%s, %s, %s, %s, %s)",
+            [resource.pk, os.path.basename(resource.file.name), f"{resource.category} {resource.tags}", body, digest],
+        )
+
+
+def index_resource(resource_id):
+    """
+    (Re)write a resource's search entry. The text is only extracted, in the process
+    pool, when the file's content differs from what the entry was built from.
+    """
+    resource = Resource.objects.filter(pk=resource_id).only('id', 'file', 'category', 'tags').first()
+    if resource is None or not fts_available():
+        return
+    digest = _file_digest(resource)
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT body, digest FROM {FTS_TABLE} WHERE rowid = %s", [resource.pk])
+        entry = cursor.fetchone()
+    if digest and entry is not None and entry[1] == digest:
+        body = entry[0]
+    else:
+        body = _extract_texts([resource])[0]
+    _write_entry(resource, body, digest)
+
+
+def unindex_resource(resource_id):
+    if fts_available():
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [resource_id])
+
+
+def reindex_resources(queryset=None):
+    """Rebuild search entries, extracting several files at once across the pool."""
+    if not fts_available():
+        return 0
+    resources = list((queryset if queryset is not None else Resource.objects.all()).only('id', 'file', 'category', 'tags'))
+    for resource, body in zip(resources, _extract_texts(resources)):
+        _write_entry(resource, body, _file_digest(resource))
+    return len(resources)
+
+
+def fts_query(text):
+    """
+    Turn free text into an FTS5 query: every word must appear, the last one may be a
+    prefix. Words are quoted so FTS5 operators and punctuation in user input are inert.
+    """
+    terms = [term.replace('"', '""') for term in text.split()]
+    if not terms:
+        return ''
+    return ' '.join(f'"{term}"' for term in terms) + '*'
+
+
+def _mark(text):
+    """Escape extracted text for HTML, then turn the FTS5 match markers into <mark> tags."""
+    return escape(text).replace(MATCH_START, '<mark>').replace(MATCH_END, '</mark>')
+
+
+def search_resources(text, queryset, limit=MAX_SEARCH_RESULTS):
+    """
+    Ranked matches among `queryset` as (resource id, rank, highlighted title, snippet),
+    best first. Lower bm25 ranks are better. Title and snippet are HTML-escaped, with
+    the matches wrapped in <mark>.
+    """
+    query = fts_query(text)
+    if not query:
+        return []
+    allowed_sql, allowed_params = queryset.order_by().values('pk').query.sql_with_params()
+    weights = ', '.join(str(weight) for weight in RANK_WEIGHTS)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid, bm25({FTS_TABLE}, {weights}) AS rank, "
+            f"highlight({FTS_TABLE}, 0, %s, %s), "
+            f"snippet({FTS_TABLE}, 2, %s, %s, '…', 24) "
+            f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND rowid IN ({allowed_sql}) "
+            f"ORDER BY rank LIMIT %s",
+            [MATCH_START, MATCH_END, MATCH_START, MATCH_END, query, *allowed_params, limit],
+        )
+        rows = cursor.fetchall()
+    return [(resource_id, rank, _mark(title), _mark(snippet)) for resource_id, rank, title, snippet in rows]
+
@@ -0,0 +1,40 @@
+import os
+
+from django.core.files import File
+from django.core.management.base import BaseCommand
+
+from blog.models import AssignmentSubmission
+from resources.models import Resource
+from resources.storage import content_addressed_storage
+
+
+class Command(BaseCommand):
+    help = "Move files stored before content-addressed storage into shared blobs, one copy per distinct content."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Only count the files that would be moved.")
+
+    def handle(self, *args, **options):
+        storage = content_addressed_storage
+        for model in (Resource, AssignmentSubmission):
+            rows = model.objects.exclude(file='').exclude(file=None).values_list('pk', 'file')
+            moved = missing = 0
+            for pk, name in rows.iterator():
+                if storage.blob_digest(name):
+                    continue
+                if options['dry_run']:
+                    moved += 1
+                    continue
+                try:
+                    source = storage.open(name, 'rb')
+                except FileNotFoundError:
+                    missing += 1
+                    continue
+                with source:
+                    blob_name = storage.save(os.path.basename(name), File(source), max_length=model._meta.get_field('file').max_length)
+                # update() rather than save(): the row keeps its single, new reference.
+                model.objects.filter(pk=pk).update(file=blob_name)
+                storage.delete(name)
+                moved += 1
+            verb = "Would move" if options['dry_run'] else "Moved"
+            self.stdout.write(f"{model._meta.label}: {verb} {moved} file(s), {missing} missing.")
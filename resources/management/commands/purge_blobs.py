@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from resources.storage import ORPHAN_GRACE_SECONDS, content_addressed_storage
+
+
+class Command(BaseCommand):
+    help = "Delete stored file contents that no row references, such as uploads whose transaction rolled back."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace', type=int, default=ORPHAN_GRACE_SECONDS, help="Leave files younger than this many seconds alone.")
+
+    def handle(self, *args, **options):
+        purged = content_addressed_storage.purge_orphans(options['grace'])
+        self.stdout.write(self.style.SUCCESS(f"Purged {purged} orphaned file(s)."))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from resources.indexing import fts_available, reindex_resources
+
+
+class Command(BaseCommand):
+    help = "Re-extract the text of every resource and rebuild the full-text search index."
+
+    def handle(self, *args, **options):
+        if not fts_available():
+            raise CommandError("Full-text search needs SQLite with FTS5; run migrate first.")
+        indexed = reindex_resources()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} resource(s)."))
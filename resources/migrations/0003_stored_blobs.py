@@ -0,0 +1,28 @@
+# Generated by Django 5.1.1 on 2026-10-18 18:20
+
+import resources.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resources', '0002_alter_resource_file_alter_resource_uploaded_by'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredBlob',
+            fields=[
+                ('sha256', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('size', models.PositiveBigIntegerField()),
+                ('refcount', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='resource',
+            name='file',
+            field=models.FileField(max_length=255, storage=resources.storage.ContentAddressedStorage(), upload_to='resources/media'),
+        ),
+    ]
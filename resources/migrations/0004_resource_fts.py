@@ -0,0 +1,30 @@
+from django.db import migrations
+
+FTS_TABLE = 'resources_resource_fts'
+
+
+def create_fts_table(apps, schema_editor):
+    # Full-text search uses SQLite's FTS5; other databases fall back to the plain search filter.
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+        "USING fts5(title, tags, body, tokenize='porter unicode61')"
+    )
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resources', '0003_stored_blobs'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.1 on 2026-10-18 18:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resources', '0004_resource_fts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64, unique=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='resource',
+            name='tag_set',
+            field=models.ManyToManyField(blank=True, related_name='resources', to='resources.tag'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+import re
+
+from django.db import migrations
+
+BATCH_SIZE = 1000
+
+
+def parse_tags(value):
+    # Frozen copy of resources.tagging.parse_tags as of this migration.
+    names = []
+    for part in re.split(r'[,;]', value or ''):
+        name = ' '.join(part.split()).lower()[:64]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def backfill_tags(apps, schema_editor):
+    Resource = apps.get_model('resources', 'Resource')
+    Tag = apps.get_model('resources', 'Tag')
+    Link = Resource.tag_set.through
+
+    parsed = {resource_id: parse_tags(tags) for resource_id, tags in Resource.objects.values_list('id', 'tags').iterator()}
+    names = {name for tag_names in parsed.values() for name in tag_names}
+    Tag.objects.bulk_create([Tag(name=name) for name in names], ignore_conflicts=True, batch_size=BATCH_SIZE)
+    tag_ids = dict(Tag.objects.values_list('name', 'id'))
+    Link.objects.bulk_create(
+        [Link(resource_id=resource_id, tag_id=tag_ids[name]) for resource_id, tag_names in parsed.items() for name in tag_names],
+        ignore_conflicts=True,
+        batch_size=BATCH_SIZE,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resources', '0005_resource_tag_set'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_tags, migrations.RunPython.noop),
+    ]
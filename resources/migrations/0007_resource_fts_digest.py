@@ -0,0 +1,35 @@
+from django.db import migrations
+
+FTS_TABLE = 'resources_resource_fts'
+
+
+def _rebuild_fts_table(schema_editor, columns, copied, values):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE {FTS_TABLE}_new "
+        f"USING fts5({columns}, tokenize='porter unicode61')"
+    )
+    schema_editor.execute(f"INSERT INTO {FTS_TABLE}_new (rowid, {copied}) SELECT rowid, {values} FROM {FTS_TABLE}")
+    schema_editor.execute(f"DROP TABLE {FTS_TABLE}")
+    schema_editor.execute(f"ALTER TABLE {FTS_TABLE}_new RENAME TO {FTS_TABLE}")
+
+
+def add_digest_column(apps, schema_editor):
+    # The content hash an entry was extracted from, so saves that keep the file skip re-extraction.
+    _rebuild_fts_table(schema_editor, 'title, tags, body, digest UNINDEXED', 'title, tags, body, digest', "title, tags, body, ''")
+
+
+def remove_digest_column(apps, schema_editor):
+    _rebuild_fts_table(schema_editor, 'title, tags, body', 'title, tags, body', 'title, tags, body')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resources', '0006_backfill_resource_tags'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_digest_column, remove_digest_column),
+    ]
@@ -1,11 +1,31 @@
 from django.db import models
 from django.conf import settings
 from courses.models import Course
+from .storage import content_addressed_storage
+
+class StoredBlob(models.Model):
+    """One stored file content, shared by every FileField value that references it."""
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    size = models.PositiveBigIntegerField()
+    refcount = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.sha256} ({self.refcount} reference(s))"
+
+class Tag(models.Model):
+    """A normalized resource tag: lower case, single-spaced (see resources.tagging.parse_tags)."""
+    name = models.CharField(max_length=64, unique=True)
+
+    def __str__(self):
+        return self.name
 
 class Resource(models.Model):
-    file = models.FileField(upload_to='resources/media')
+    file = models.FileField(upload_to='resources/media', storage=content_addressed_storage, max_length=255)
     category = models.CharField(max_length=100)
     tags = models.CharField(max_length=255)
+    # Indexed copy of `tags`, kept in sync on save; filter and facet on this, not on the string.
+    tag_set = models.ManyToManyField(Tag, related_name='resources', blank=True)
     courses = models.ForeignKey(Course, related_name='resources', on_delete=models.CASCADE)
     uploaded_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='resources')
 
@@ -1,5 +1,7 @@
 from rest_framework.permissions import BasePermission, SAFE_METHODS
 
+from .policies import RESOURCE_POLICY
+
 class IsAdminOrTeacherOrReadOnly(BasePermission):
     """
     Custom permission to only allow admins and teachers to edit or delete resources.
@@ -16,5 +18,5 @@ class IsAdminOrTeacherOrReadOnly(BasePermission):
 
     def has_object_permission(self, request, view, obj):
         if request.method in SAFE_METHODS:
-            return obj.courses.students.filter(id=request.user.id).exists()
+            return RESOURCE_POLICY.allows(request.user, obj)
         return obj.uploaded_by == request.user or request.user.role == 'admin' or request.user.role == 'teacher'
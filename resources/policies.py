@@ -0,0 +1,8 @@
+from courses.policies import AccessPolicy, EVERYTHING, InCourse
+
+# Teachers and admins browse every resource; students those of the courses they attend.
+RESOURCE_POLICY = AccessPolicy(
+    admin=EVERYTHING,
+    teacher=EVERYTHING,
+    student=InCourse('courses', 'enrolled'),
+)
@@ -0,0 +1,70 @@
+import hashlib
+import json
+import os
+
+from django.conf import settings
+from django.core.cache import cache
+
+from django_project.tasks import defer, run_in_processes
+from .derivatives import render_preview
+from .models import Resource
+
+HASH_READ_SIZE = 1024 * 1024
+# A render requested while polling blocks further requests for the same content this long.
+PREVIEW_RENDER_TIMEOUT = 60
+
+
+def content_digest(fieldfile):
+    """
+    SHA-256 of a stored file. Content-addressed names already carry it; older files
+    are hashed once per (name, size, mtime) and the result is cached.
+    """
+    storage = fieldfile.storage
+    digest = storage.blob_digest(fieldfile.name) if hasattr(storage, 'blob_digest') else None
+    if digest:
+        return digest
+    path = fieldfile.path
+    stat = os.stat(path)
+    key = f'resources:digest:{hashlib.md5(fieldfile.name.encode()).hexdigest()}:{stat.st_size}:{stat.st_mtime_ns}'
+    digest = cache.get(key)
+    if digest is None:
+        sha256 = hashlib.sha256()
+        with open(path, 'rb') as source:
+            for block in iter(lambda: source.read(HASH_READ_SIZE), b''):
+                sha256.update(block)
+        digest = sha256.hexdigest()
+        cache.set(key, digest, None)
+    return digest
+
+
+def derivative_paths(digest):
+    """(thumbnail, manifest) paths. Derivatives are keyed by content, so copies share them."""
+    base = os.path.join(settings.RESOURCE_PREVIEW_DIR, digest[:2], digest)
+    return base + '.png', base + '.json'
+
+
+def read_preview(digest):
+    """The preview manifest for some content, or None if it hasn't been generated yet."""
+    try:
+        with open(derivative_paths(digest)[1]) as manifest:
+            return json.load(manifest)
+    except FileNotFoundError:
+        return None
+
+
+def generate_preview(resource_id):
+    """Render a resource's thumbnail and text preview in the process pool, unless its content already has them."""
+    resource = Resource.objects.filter(pk=resource_id).only('id', 'file').first()
+    if resource is None or not resource.file:
+        return None
+    digest = content_digest(resource.file)
+    thumbnail_path, manifest_path = derivative_paths(digest)
+    if os.path.exists(manifest_path):
+        return read_preview(digest)
+    return run_in_processes(render_preview, [(resource.file.path, resource.file.name, thumbnail_path, manifest_path)])[0]
+
+
+def request_preview(resource_id, digest):
+    """Queue a preview render for the content, unless one was queued in the last PREVIEW_RENDER_TIMEOUT."""
+    if cache.add(f'resources:preview_render:{digest}', True, PREVIEW_RENDER_TIMEOUT):
+        defer(generate_preview, resource_id)
@@ -1,7 +1,19 @@
+from django.urls import reverse
 from rest_framework import serializers
 from .models import Resource
 
 class ResourceSerializer(serializers.ModelSerializer):
+    tag_names = serializers.SlugRelatedField(source='tag_set', slug_field='name', many=True, read_only=True)
+    preview = serializers.SerializerMethodField()
+
     class Meta:
         model = Resource
-        fields = ['id', 'file', 'category', 'tags', 'courses', 'uploaded_by']
+        fields = ['id', 'file', 'category', 'tags', 'tag_names', 'courses', 'uploaded_by', 'preview']
+
+    def get_preview(self, obj):
+        # Just the link: listings never touch the file or its derivatives.
+        if obj.pk is None:
+            return None
+        url = reverse('resource-preview', args=[obj.pk])
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
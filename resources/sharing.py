@@ -0,0 +1,26 @@
+import time
+
+from django.conf import settings
+from django.core import signing
+
+SHARE_LINK_SALT = 'resources.share-link'
+
+
+def make_share_token(resource, expires_in=None):
+    """
+    Signed token naming the resource, its stored file and when the link expires.
+    The file name inside serves the download; the resource ID lets it check that
+    the resource still exists and still has that file.
+    """
+    expires_in = min(expires_in or settings.RESOURCE_SHARE_LINK_MAX_AGE, settings.RESOURCE_SHARE_LINK_MAX_AGE)
+    expires_at = int(time.time()) + expires_in
+    token = signing.dumps({'r': resource.pk, 'f': resource.file.name, 'e': expires_at}, salt=SHARE_LINK_SALT, compress=True)
+    return token, expires_at
+
+
+def read_share_token(token):
+    """(resource ID, file name, expiry timestamp) from a share token. Raises signing.BadSignature if it is forged or expired."""
+    payload = signing.loads(token, salt=SHARE_LINK_SALT, max_age=settings.RESOURCE_SHARE_LINK_MAX_AGE)
+    if payload['e'] < time.time():
+        raise signing.SignatureExpired("Share link expired.")
+    return payload.get('r'), payload['f'], payload['e']
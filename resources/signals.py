@@ -0,0 +1,38 @@
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from django_project.tasks import defer
+from .models import Resource
+from .storage import release_replaced_file, release_deleted_file
+from .indexing import index_resource, unindex_resource
+from .previews import generate_preview
+from .tagging import sync_resource_tags
+
+
+@receiver(pre_save, sender=Resource)
+def release_replaced_resource_file(sender, instance, **kwargs):
+    release_replaced_file(instance, 'file')
+
+
+@receiver(post_delete, sender=Resource)
+def release_resource_file(sender, instance, **kwargs):
+    release_deleted_file(instance, 'file')
+
+
+@receiver(post_save, sender=Resource)
+def sync_tags(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or 'tags' in update_fields:
+        sync_resource_tags(instance)
+
+
+@receiver(post_save, sender=Resource)
+def index_resource_text(sender, instance, **kwargs):
+    # Extraction happens after the response, so uploads are not slowed down.
+    defer(index_resource, instance.pk)
+    defer(generate_preview, instance.pk)
+
+
+@receiver(post_delete, sender=Resource)
+def unindex_resource_text(sender, instance, **kwargs):
+    resource_id = instance.pk
+    transaction.on_commit(lambda: unindex_resource(resource_id))
@@ -0,0 +1,207 @@
+import hashlib
+import os
+import re
+import tempfile
+import time
+
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+from django.utils.deconstruct import deconstructible
+
+BLOB_PREFIX = 'blobs'
+HASH_READ_SIZE = 1024 * 1024
+# Unreferenced blob files younger than this may belong to a transaction still in progress.
+ORPHAN_GRACE_SECONDS = 60 * 60
+# blobs/<first two hex digits>/<sha256>/<original file name>
+BLOB_NAME = re.compile(r'^blobs/[0-9a-f]{2}/(?P<digest>[0-9a-f]{64})/[^/]+$')
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File system storage that keeps one copy of each distinct content. Uploads are
+    hashed while they are streamed to disk and stored once under their SHA-256;
+    the name handed back to the FileField is `blobs/<aa>/<sha256>/<original name>`,
+    so downloads and media URLs keep their file name; `path()` maps every such name
+    to the single file at `blobs/<aa>/<sha256>`. `resources.StoredBlob` counts the
+    references and a blob is removed when the last one is deleted.
+
+    Names that do not look like blob names (files stored before this backend) are
+    handled exactly like FileSystemStorage would.
+    """
+
+    def blob_digest(self, name):
+        match = BLOB_NAME.match(str(name).replace('\\', '/'))
+        return match.group('digest') if match else None
+
+    def blob_path(self, digest):
+        return super().path(f'{BLOB_PREFIX}/{digest[:2]}/{digest}')
+
+    def path(self, name):
+        digest = self.blob_digest(name)
+        if digest is None:
+            return super().path(name)
+        return self.blob_path(digest)
+
+    def get_available_name(self, name, max_length=None):
+        # Same content under the same file name is the same blob, so names are never
+        # suffixed; the file name is only shortened to fit next to the digest.
+        if max_length is not None:
+            room = max_length - len(f'{BLOB_PREFIX}/aa/{"0" * 64}/')
+            directory, filename = os.path.split(name)
+            if len(filename) > room:
+                root, extension = os.path.splitext(filename)
+                filename = root[:max(room - len(extension), 1)] + extension
+            name = os.path.join(directory, filename)
+        return name
+
+    def _save(self, name, content):
+        if hasattr(content, 'temporary_file_path'):
+            # Already on disk (a completed chunked upload or a large request body): hash it, then move it.
+            temporary_path = content.temporary_file_path()
+            digest, size = self._hash_file(temporary_path)
+            moved = False
+        else:
+            temporary_path, digest, size = self._spool(content)
+            moved = True
+        try:
+            self._retain(digest, size, temporary_path, moved)
+        finally:
+            if moved and os.path.exists(temporary_path):
+                os.remove(temporary_path)
+        return f'{BLOB_PREFIX}/{digest[:2]}/{digest}/{os.path.basename(name)}'
+
+    def delete(self, name):
+        if not name:
+            raise ValueError("The name must be given to delete().")
+        digest = self.blob_digest(name)
+        if digest is None:
+            return super().delete(name)
+        self._release(digest)
+
+    def _hash_file(self, path):
+        sha256 = hashlib.sha256()
+        size = 0
+        with open(path, 'rb') as source:
+            for block in iter(lambda: source.read(HASH_READ_SIZE), b''):
+                sha256.update(block)
+                size += len(block)
+        return sha256.hexdigest(), size
+
+    def _spool(self, content):
+        """Copy `content` into a temporary file next to the blobs, hashing it on the way."""
+        incoming = super().path('.incoming')
+        os.makedirs(incoming, exist_ok=True)
+        sha256 = hashlib.sha256()
+        size = 0
+        with tempfile.NamedTemporaryFile(dir=incoming, delete=False) as spool:
+            if hasattr(content, 'seek'):
+                content.seek(0)
+            for chunk in content.chunks():
+                if isinstance(chunk, str):
+                    chunk = chunk.encode()
+                sha256.update(chunk)
+                spool.write(chunk)
+                size += len(chunk)
+        return spool.name, sha256.hexdigest(), size
+
+    def purge_orphans(self, grace_seconds=ORPHAN_GRACE_SECONDS):
+        """
+        Delete blob files without a StoredBlob row, e.g. written by a transaction
+        that rolled back, and abandoned spool files. Returns how many were removed.
+        """
+        from .models import StoredBlob
+
+        cutoff = time.time() - grace_seconds
+        removed = 0
+        blobs, incoming = super().path(BLOB_PREFIX), super().path('.incoming')
+        for directory in (blobs, incoming):
+            for root, _, files in os.walk(directory):
+                for filename in files:
+                    path = os.path.join(root, filename)
+                    if os.path.getmtime(path) > cutoff:
+                        continue
+                    if directory == blobs:
+                        if not re.fullmatch(r'[0-9a-f]{64}', filename):
+                            continue
+                        with transaction.atomic():
+                            # Holding the row keeps a concurrent upload of the same content waiting.
+                            blob, created = StoredBlob.objects.select_for_update().get_or_create(sha256=filename, defaults={'size': 0})
+                            if not created:
+                                continue
+                            os.remove(path)
+                            blob.delete()
+                    else:
+                        os.remove(path)
+                    removed += 1
+        return removed
+
+    def _retain(self, digest, size, source_path, owned):
+        from .models import StoredBlob
+
+        with transaction.atomic():
+            blob, _ = StoredBlob.objects.select_for_update().get_or_create(sha256=digest, defaults={'size': size})
+            target = self.blob_path(digest)
+            if not os.path.exists(target):
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                if owned:
+                    os.replace(source_path, target)
+                else:
+                    file_move_safe(source_path, target)
+                if self.file_permissions_mode is not None:
+                    os.chmod(target, self.file_permissions_mode)
+            elif not owned:
+                # Content is already stored; the caller's temporary file is redundant.
+                os.remove(source_path)
+            StoredBlob.objects.filter(pk=blob.pk).update(refcount=F('refcount') + 1)
+
+    def _release(self, digest):
+        from .models import StoredBlob
+
+        with transaction.atomic():
+            blob = StoredBlob.objects.select_for_update().filter(sha256=digest).first()
+            if blob is None:
+                return
+            if blob.refcount > 1:
+                StoredBlob.objects.filter(pk=digest).update(refcount=F('refcount') - 1)
+                return
+            blob.delete()
+            target = self.blob_path(digest)
+
+            def remove_unreferenced():
+                # Someone may have uploaded the same content again in the meantime.
+                if not StoredBlob.objects.filter(pk=digest).exists():
+                    try:
+                        os.remove(target)
+                    except FileNotFoundError:
+                        pass
+
+            transaction.on_commit(remove_unreferenced)
+
+
+content_addressed_storage = ContentAddressedStorage()
+
+
+def release_replaced_file(instance, field_name):
+    """
+    pre_save helper: drop the reference held by the file currently stored on the
+    row if this save replaces it. A pending upload is always a new reference, even
+    when it has the same name as the file it replaces.
+    """
+    if instance.pk is None:
+        return
+    previous = type(instance)._default_manager.filter(pk=instance.pk).values_list(field_name, flat=True).first()
+    current = getattr(instance, field_name)
+    if previous and (previous != current.name or not current._committed):
+        storage = current.storage
+        transaction.on_commit(lambda: storage.delete(previous))
+
+
+def release_deleted_file(instance, field_name):
+    """post_delete helper: drop the reference held by a deleted row's file."""
+    fieldfile = getattr(instance, field_name)
+    if fieldfile.name:
+        storage, name = fieldfile.storage, fieldfile.name
+        transaction.on_commit(lambda: storage.delete(name))
@@ -0,0 +1,56 @@
+import re
+
+from django.db.models import Count
+
+from .models import Resource, Tag
+
+TAG_MAX_LENGTH = 64
+TAG_SEPARATORS = re.compile(r'[,;]')
+
+
+def parse_tags(value):
+    """
+    Split a free-form tag string on commas (or semicolons) into normalized names:
+    lower case, single-spaced, de-duplicated, in their original order.
+    """
+    names = []
+    for part in TAG_SEPARATORS.split(value or ''):
+        name = ' '.join(part.split()).lower()[:TAG_MAX_LENGTH]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def sync_resource_tags(resource):
+    """Make `resource.tag_set` match its `tags` string."""
+    names = parse_tags(resource.tags)
+    existing = {tag.name: tag for tag in Tag.objects.filter(name__in=names)}
+    missing = [Tag(name=name) for name in names if name not in existing]
+    if missing:
+        Tag.objects.bulk_create(missing, ignore_conflicts=True)
+        existing = {tag.name: tag for tag in Tag.objects.filter(name__in=names)}
+    resource.tag_set.set([existing[name] for name in names])
+
+
+def filter_by_tags(queryset, names, match_all=True):
+    """
+    Resources tagged with every name in `names` (or, with match_all=False, any of
+    them). Both are answered from the tag/resource mapping's indexes.
+    """
+    names = parse_tags(','.join(names))
+    if not names:
+        return queryset
+    links = Resource.tag_set.through.objects.filter(tag__name__in=names)
+    if match_all:
+        links = links.values('resource_id').annotate(matched=Count('tag_id')).filter(matched=len(names))
+    return queryset.filter(pk__in=links.values('resource_id'))
+
+
+def tag_counts(queryset):
+    """Number of resources in `queryset` per tag, most used first."""
+    return list(
+        Resource.tag_set.through.objects.filter(resource_id__in=queryset.order_by().values('pk'))
+        .values('tag__name').annotate(count=Count('resource_id'))
+        .order_by('-count', 'tag__name')
+        .values_list('tag__name', 'count')
+    )
@@ -1,3 +1,89 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
 
-# Create your tests here.
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.test import TestCase, override_settings
+
+from courses.models import Course
+from users.models import CustomUser
+from .models import Resource, StoredBlob
+from .storage import content_addressed_storage
+
+
+class ContentAddressedStorageTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root, BACKGROUND_TASKS_EAGER=True)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.storage = content_addressed_storage
+        self.teacher = CustomUser.objects.create_user('teacher', password='pw', role='teacher')
+        self.course = Course.objects.create(name='Algebra', description='')
+
+    def refcount(self, name):
+        return StoredBlob.objects.get(sha256=self.storage.blob_digest(name)).refcount
+
+    def create_resource(self, name, content):
+        return Resource.objects.create(
+            file=ContentFile(content, name=name), category='notes', tags='',
+            courses=self.course, uploaded_by=self.teacher,
+        )
+
+    def test_identical_content_is_stored_once(self):
+        first = self.storage.save('week1.pdf', ContentFile(b'same bytes'))
+        second = self.storage.save('copy.pdf', ContentFile(b'same bytes'))
+        self.assertNotEqual(first, second)
+        self.assertEqual(self.storage.path(first), self.storage.path(second))
+        self.assertEqual(self.refcount(first), 2)
+        self.assertTrue(first.endswith('/week1.pdf'))
+        self.assertTrue(self.storage.url(second).endswith('/copy.pdf'))
+
+    def test_blob_is_removed_with_its_last_reference(self):
+        first = self.storage.save('a.txt', ContentFile(b'shared'))
+        second = self.storage.save('b.txt', ContentFile(b'shared'))
+        path = self.storage.path(first)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.storage.delete(first)
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(self.refcount(second), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.storage.delete(second)
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(StoredBlob.objects.exists())
+
+    def test_replacing_and_deleting_resources_release_their_files(self):
+        resource = self.create_resource('old.txt', b'old content')
+        kept = self.create_resource('kept.txt', b'old content')
+        old_name = resource.file.name
+        self.assertEqual(self.refcount(old_name), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            resource.file = ContentFile(b'new content', name='new.txt')
+            resource.save()
+        self.assertEqual(self.refcount(old_name), 1)
+        self.assertEqual(self.refcount(resource.file.name), 1)
+
+        new_path = resource.file.path
+        with self.captureOnCommitCallbacks(execute=True):
+            resource.delete()
+        self.assertFalse(os.path.exists(new_path))
+        self.assertTrue(os.path.exists(kept.file.path))
+
+    def test_purge_removes_blobs_of_rolled_back_transactions(self):
+        kept = self.storage.save('kept.txt', ContentFile(b'committed'))
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                orphan = self.storage.save('orphan.txt', ContentFile(b'rolled back'))
+                raise RuntimeError
+        orphan_path = self.storage.path(orphan)
+        self.assertTrue(os.path.exists(orphan_path))
+
+        # Files younger than the grace period may belong to a transaction still running.
+        self.assertEqual(self.storage.purge_orphans(), 0)
+        self.assertEqual(self.storage.purge_orphans(grace_seconds=-1), 1)
+        self.assertFalse(os.path.exists(orphan_path))
+        self.assertTrue(os.path.exists(self.storage.path(kept)))
+        self.assertEqual(self.refcount(kept), 1)
@@ -1,10 +1,11 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ResourceViewSet
+from .views import ResourceViewSet, shared_download
 
 router = DefaultRouter()
 router.register(r'resources', ResourceViewSet)
 
 urlpatterns = [
+    path('resources/shared/<str:token>/', shared_download, name='resource-shared-download'),
     path('', include(router.urls)),
 ]
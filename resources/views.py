@@ -1,17 +1,32 @@
+import time
+from datetime import datetime, timezone as dt_timezone
+
 from rest_framework import viewsets
 from .models import Resource
 from rest_framework.decorators import action
 from .serializers import ResourceSerializer
+from .policies import RESOURCE_POLICY
 from .permissions import IsAdminOrTeacherOrReadOnly
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.core.mail import send_mail
 from django.conf import settings
-from django.http import FileResponse
-from django.shortcuts import get_object_or_404
+from django.core import signing
+from django.db.models import Q
+from django.db.models.fields.files import FieldFile
+from django.http import FileResponse, Http404
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.views.decorators.http import require_safe
 from rest_framework import status
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
+from .downloads import serve_file
+from .sharing import make_share_token, read_share_token
+from .indexing import MAX_SEARCH_RESULTS, fts_available, search_resources
+from .previews import content_digest, derivative_paths, read_preview, request_preview
+from .tagging import filter_by_tags, tag_counts as count_tags
 
 class ResourceViewSet(viewsets.ModelViewSet):
     queryset = Resource.objects.all()
@@ -30,41 +45,183 @@ class ResourceViewSet(viewsets.ModelViewSet):
         the currently authenticated user if they are a student.
         If they are a teacher or admin, return all resources.
         """
-        user = self.request.user
-        if user.role == 'student':
-            return Resource.objects.filter(courses__students=user).distinct() 
-        return Resource.objects.all() 
+        return RESOURCE_POLICY.filter(Resource.objects.prefetch_related('tag_set'), self.request.user)
+
+    def filter_queryset(self, queryset):
+        """
+        Adds exact tag filtering: ?tag=python&tag=statistics matches resources with
+        both tags, ?tag=python,statistics&tag_mode=any those with either.
+        """
+        queryset = super().filter_queryset(queryset)
+        names = [name for value in self.request.query_params.getlist('tag') for name in value.split(',')]
+        if names:
+            match_all = self.request.query_params.get('tag_mode', 'all') != 'any'
+            queryset = filter_by_tags(queryset, names, match_all)
+        return queryset
+
+    @action(detail=False, methods=['get'])
+    def tag_counts(self, request):
+        """Per-tag resource counts for the current filters, for faceted browsing."""
+        counts = count_tags(self.filter_queryset(self.get_queryset()))
+        return Response([{'tag': name, 'count': count} for name, count in counts])
 
     def perform_create(self, serializer):
         serializer.save(uploaded_by=self.request.user)
 
 
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        Full-text search over file names, categories, tags and document text, best
+        match first: ?q=linear regression&limit=20. Matches are wrapped in <mark>.
+        """
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({"detail": "The q parameter is required."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', MAX_SEARCH_RESULTS)), MAX_SEARCH_RESULTS))
+        except ValueError:
+            return Response({"detail": "limit must be a number."}, status=status.HTTP_400_BAD_REQUEST)
+        if not fts_available():
+            # No FTS5: match names, categories and tags only, like the list's ?search=.
+            resources = self.get_queryset()
+            for term in query.split():
+                resources = resources.filter(Q(category__icontains=term) | Q(tags__icontains=term) | Q(file__icontains=term))
+            return Response([{'resource': data} for data in self.get_serializer(resources[:limit], many=True).data])
+
+        matches = search_resources(query, self.get_queryset(), limit)
+        resources = Resource.objects.in_bulk([resource_id for resource_id, *_ in matches])
+        results = []
+        for resource_id, rank, title, snippet in matches:
+            if resource_id in resources:
+                results.append({
+                    'resource': self.get_serializer(resources[resource_id]).data,
+                    'rank': round(-rank, 4),
+                    'title': title,
+                    'snippet': snippet,
+                })
+        return Response(results)
+
     @action(detail=False, methods=['get'])
     def by_course(self, request):
         course_id = request.query_params.get('course_id')
-        resources = self.queryset.filter(courses_id=course_id)
+        resources = self.get_queryset().filter(courses_id=course_id)
         serializer = self.get_serializer(resources, many=True)
         return Response(serializer.data)
 
     @action(detail=True, methods=['get'])
     def download(self, request, pk=None):
-        resource = get_object_or_404(Resource, pk=pk)
-        response = FileResponse(resource.file.open(), as_attachment=True)
+        resource = self.get_object()
+        try:
+            return serve_file(request, resource.file)
+        except FileNotFoundError:
+            raise Http404("The file for this resource is missing.")
+
+    @action(detail=True, methods=['get'])
+    def preview(self, request, pk=None):
+        """
+        Text preview and thumbnail URL, generated in the background after upload.
+        202 while the preview is still being rendered.
+        """
+        resource = self.get_object()
+        try:
+            digest = content_digest(resource.file)
+        except (FileNotFoundError, ValueError):
+            raise Http404("The file for this resource is missing.")
+        etag = f'"{digest}"'
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+
+        manifest = read_preview(digest)
+        if manifest is None:
+            # Clients poll this endpoint; only the first poll queues a render.
+            request_preview(resource.pk, digest)
+            return Response({"status": "pending"}, status=status.HTTP_202_ACCEPTED)
+        thumbnail = None
+        if manifest['thumbnail']:
+            thumbnail = request.build_absolute_uri(reverse('resource-thumbnail', args=[resource.pk]) + f'?v={digest}')
+        response = Response({
+            'status': 'ready',
+            'content_hash': digest,
+            'text': manifest['text'],
+            'thumbnail': thumbnail,
+        })
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, max-age=300'
+        return response
+
+    @action(detail=True, methods=['get'], url_path='preview/thumbnail')
+    def thumbnail(self, request, pk=None):
+        """PNG thumbnail. URLs carrying the content hash (?v=) never change, so they are cached for a year."""
+        resource = self.get_object()
+        try:
+            digest = content_digest(resource.file)
+        except (FileNotFoundError, ValueError):
+            raise Http404("The file for this resource is missing.")
+        etag = f'"{digest}"'
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            try:
+                response = FileResponse(open(derivative_paths(digest)[0], 'rb'), content_type='image/png')
+            except FileNotFoundError:
+                raise Http404("This resource has no thumbnail.")
+        response['ETag'] = etag
+        if request.query_params.get('v') == digest:
+            response['Cache-Control'] = 'private, max-age=31536000, immutable'
+        else:
+            response['Cache-Control'] = 'private, no-cache'
         return response
 
     @action(detail=True, methods=['post'])
     def share(self, request, pk=None):
-        resource = get_object_or_404(Resource, pk=pk)
+        resource = self.get_object()
         email = request.data.get('email')
 
         if not email:
             return Response({"detail": "Email field is required."}, status=status.HTTP_400_BAD_REQUEST)
 
-        subject = f"Check out this resource: {resource.file.name}"
-        message = f"Here is the link to download the resource: {request.build_absolute_uri(resource.file.url)}"
+        expires_in = request.data.get('expires_in')
+        try:
+            expires_in = int(expires_in) if expires_in not in (None, '') else None
+        except (TypeError, ValueError):
+            expires_in = 0
+        if expires_in is not None and expires_in < 1:
+            return Response({"detail": "expires_in must be a positive number of seconds."}, status=status.HTTP_400_BAD_REQUEST)
+        token, expires_at = make_share_token(resource, expires_in)
+        link = request.build_absolute_uri(reverse('resource-shared-download', args=[token]))
+        expires = timezone.localtime(datetime.fromtimestamp(expires_at, tz=dt_timezone.utc))
+
+        filename = resource.file.name.rsplit('/', 1)[-1]
+        subject = f"Check out this resource: {filename}"
+        message = f"Here is the link to download the resource: {link}\nThe link works until {expires:%Y-%m-%d %H:%M %Z}."
         
         send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, [email])
 
-        return Response({"detail": "Resource shared successfully."}, status=status.HTTP_200_OK)
+        return Response({"detail": "Resource shared successfully.", "url": link, "expires_at": expires}, status=status.HTTP_200_OK)
+
+
+@require_safe
+def shared_download(request, token):
+    """
+    Download through a share link. Besides the signature, the only check is one
+    primary-key lookup confirming the resource still exists with the shared file,
+    so serving a link mailed to a whole cohort costs no token or user lookups.
+    """
+    try:
+        resource_id, name, expires_at = read_share_token(token)
+    except signing.BadSignature:
+        raise Http404("This link is invalid or has expired.")
+    if not Resource.objects.filter(pk=resource_id, file=name).exists():
+        raise Http404("The shared file no longer exists.")
+    fieldfile = FieldFile(None, Resource._meta.get_field('file'), name)
+    try:
+        response = serve_file(request, fieldfile)
+    except FileNotFoundError:
+        raise Http404("The shared file no longer exists.")
+    if response.status_code in (200, 206, 304):
+        # The URL itself is the credential, so caches may keep it until the link expires.
+        response['Cache-Control'] = f'public, max-age={max(int(expires_at - time.time()), 0)}'
+    return response
 
 
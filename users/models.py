@@ -9,4 +9,13 @@ class CustomUser(AbstractUser):
         ('teacher', 'Teacher'),
         ('admin', 'Admin')
     )
-    role = models.CharField(max_length=10, choices=ROLE_CHOICES, default='student')
\ No newline at end of file
+    role = models.CharField(max_length=10, choices=ROLE_CHOICES, default='student')
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        # Reading one deferred field loads all of them, so a partially loaded user
+        # (see accounts.authentication.token_user) costs at most one more query.
+        if fields is not None:
+            deferred = self.get_deferred_fields()
+            if deferred.intersection(fields):
+                fields = deferred.union(fields)
+        super().refresh_from_db(using, fields, **kwargs)
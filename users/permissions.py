@@ -1,10 +1,12 @@
 from rest_framework import permissions
 
+from .policies import USER_POLICY
+
 class CustomUserPermission(permissions.BasePermission):
     """
     Custom permission to allow:
     - Admin: can view all users
-    - Teacher: can view their own data and students assigned to them
+    - Teacher: can view and edit their own data, and view students assigned to them
     - Student: can view only their own data
     """
 
@@ -16,7 +18,9 @@ class CustomUserPermission(permissions.BasePermission):
             return True
 
         if request.user.role == 'teacher':
-            return obj == request.user or obj in request.user.teachers.all()
+            if obj == request.user:
+                return True
+            return request.method in permissions.SAFE_METHODS and USER_POLICY.allows(request.user, obj)
 
         if request.user.role == 'student':
             return obj == request.user
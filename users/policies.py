@@ -0,0 +1,9 @@
+from courses.policies import AccessPolicy, EVERYTHING, CourseMembers, Self
+
+# Teachers see themselves and the students of their courses; students themselves
+# and the teachers of the courses they attend.
+USER_POLICY = AccessPolicy(
+    admin=EVERYTHING,
+    teacher=Self() | CourseMembers('students', 'taught', role='student'),
+    student=Self() | CourseMembers('teachers', 'enrolled', role='teacher'),
+)
@@ -1,3 +1,32 @@
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from courses.models import Course
+from .models import CustomUser
+
+
+class TeacherAccessToStudentsTests(TestCase):
+    def setUp(self):
+        self.teacher = CustomUser.objects.create_user('teacher', password='pw', role='teacher')
+        self.student = CustomUser.objects.create_user('student', password='pw', role='student')
+        course = Course.objects.create(name='Algebra', description='')
+        course.teachers.add(self.teacher)
+        course.students.add(self.student)
+        self.client = APIClient()
+        self.client.force_authenticate(self.teacher)
+
+    def test_teacher_can_view_their_student(self):
+        response = self.client.get(f'/api/users/{self.student.pk}/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_teacher_cannot_edit_or_delete_their_student(self):
+        response = self.client.patch(f'/api/users/{self.student.pk}/', {'first_name': 'Changed'}, format='json')
+        self.assertEqual(response.status_code, 403)
+        response = self.client.delete(f'/api/users/{self.student.pk}/')
+        self.assertEqual(response.status_code, 403)
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.first_name, '')
+
+    def test_teacher_can_edit_themselves(self):
+        response = self.client.patch(f'/api/users/{self.teacher.pk}/', {'first_name': 'Ada'}, format='json')
+        self.assertEqual(response.status_code, 200)